@@ -17,6 +17,7 @@ Options:
   --min-mag=MAG           : 最小マグニチュードを指定します。[default: 3.0]
 """
 
+import bisect
 import datetime
 import logging
 import pathlib
@@ -58,12 +59,15 @@ def get_screenshots_to_clean(
     cache_db_path = config.data.cache
     quake_db_path = config.data.quake
 
-    # スクリーンショット取得
+    # スクリーンショット取得（比較に使う UNIX エポック秒は SQL 側で求める）。
+    # 生成列 timestamp_epoch は ScreenshotManager のマイグレーションで追加されるため、
+    # マイグレーション前の cache.db でも動くよう timestamp から直接求める
     with sqlite3.connect(cache_db_path) as cache_db:
         cache_db.row_factory = sqlite3.Row
         screenshots = cache_db.execute(
             """
-            SELECT filename, filepath, timestamp, max_count
+            SELECT filename, filepath, timestamp, max_count,
+                   CAST(strftime('%s', timestamp) AS INTEGER) AS timestamp_epoch
             FROM screenshot_metadata
             WHERE max_count >= ?
             ORDER BY timestamp
@@ -71,38 +75,32 @@ def get_screenshots_to_clean(
             (min_max_count,),
         ).fetchall()
 
-    # 地震データ取得
+    # 地震の時刻を UNIX エポック秒の昇順で取得し、二分探索できるようにする
+    # （strftime('%s') はオフセット付き ISO 文字列を UTC に換算するためタイムゾーンに依らず比較できる）
     with sqlite3.connect(quake_db_path) as quake_db:
-        quake_db.row_factory = sqlite3.Row
-        earthquakes = quake_db.execute(
-            """
-            SELECT detected_at, epicenter_name, magnitude
-            FROM earthquakes
-            WHERE magnitude >= ?
-            """,
-            (min_magnitude,),
-        ).fetchall()
-
-    # 地震の時刻をパース
-    quake_times = []
-    for eq in earthquakes:
-        dt = datetime.datetime.fromisoformat(eq["detected_at"])
-        quake_times.append((dt, eq["epicenter_name"], eq["magnitude"]))
+        quake_times = [
+            detected_epoch
+            for (detected_epoch,) in quake_db.execute(
+                """
+                SELECT CAST(strftime('%s', detected_at) AS INTEGER) AS detected_epoch
+                FROM earthquakes
+                WHERE magnitude >= ?
+                ORDER BY detected_epoch
+                """,
+                (min_magnitude,),
+            )
+        ]
 
     # 削除対象を特定
     time_window_seconds = time_window_minutes * 60
     to_delete = []
 
     for ss in screenshots:
-        ss_time = datetime.datetime.fromisoformat(ss["timestamp"])
+        ss_epoch = ss["timestamp_epoch"]
 
-        # 付近に地震があるか確認（aware datetime 同士の差分はタイムゾーンに依らず正しい）
-        found_quake = None
-        for qt, name, mag in quake_times:
-            diff = abs((ss_time - qt).total_seconds())
-            if diff <= time_window_seconds:
-                found_quake = (qt, name, mag, diff)
-                break
+        # 時間窓の下端以上で最初の地震が上端以下なら、付近に地震がある
+        index = bisect.bisect_left(quake_times, ss_epoch - time_window_seconds)
+        found_quake = index < len(quake_times) and quake_times[index] <= ss_epoch + time_window_seconds
 
         if not found_quake:
             to_delete.append(
@@ -110,7 +108,7 @@ def get_screenshots_to_clean(
                     "filename": ss["filename"],
                     "filepath": ss["filepath"],
                     # 表示用に JST へ変換して保持する
-                    "timestamp": rsudp.types.to_jst(ss_time),
+                    "timestamp": rsudp.types.to_jst(datetime.datetime.fromisoformat(ss["timestamp"])),
                     "max_count": ss["max_count"],
                 }
             )
@@ -172,6 +170,7 @@ def delete_screenshots(config: rsudp.config.Config, screenshots: list[dict], *,
     screenshot_dir = config.plot.screenshot.path
 
     deleted_count = 0
+    deleted_filenames: list[tuple[str]] = []
 
     with sqlite3.connect(cache_db_path) as cache_db:
         for ss in screenshots:
@@ -192,15 +191,13 @@ def delete_screenshots(config: rsudp.config.Config, screenshots: list[dict], *,
                 else:
                     logging.warning("ファイルなし: %s", file_path)
 
-                # DBレコード削除
-                cache_db.execute(
-                    "DELETE FROM screenshot_metadata WHERE filename = ?",
-                    (ss["filename"],),
-                )
+                deleted_filenames.append((ss["filename"],))
 
             deleted_count += 1
 
         if not dry_run:
+            # DBレコード削除（1 つのプリペアドステートメントでまとめて実行）
+            cache_db.executemany("DELETE FROM screenshot_metadata WHERE filename = ?", deleted_filenames)
             cache_db.commit()
 
     # 空ディレクトリを削除
@@ -50,6 +50,10 @@ def _create_app(config: rsudp.config.Config):
 
     app = flask.Flask(__name__)
 
+    # NOTE: デバッグモードでも整形せず、キーのソートも行わない
+    app.json.sort_keys = False
+    app.json.compact = True
+
     flask_cors.CORS(app)
 
     app.config["CONFIG"] = config
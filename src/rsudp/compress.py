@@ -8,7 +8,7 @@ data ディレクトリの圧縮ユーティリティ.
 
 外部バイナリ ``zstd`` / ``cwebp`` を subprocess 経由で利用する。
 スクリーンショットのメタデータ（STA/LTA 等）は cache.db が真実のソースであり、
-変換時に cache.db の filename/filepath/file_size を WebP のものへ更新する。
+変換時に cache.db の filename/filepath/file_size/file_mtime を WebP のものへ更新する。
 """
 
 # subprocess は固定の信頼できるコマンド（zstd / cwebp）のみを実行するため S603/S607 を抑制する
@@ -192,7 +192,7 @@ def convert_screenshots(
     スクリーンショット PNG を WebP（lossy + sharp_yuv）へ変換する.
 
     cache.db に登録済みの ``*.png`` を対象に cwebp で WebP へ変換し、変換後は
-    cache.db の filename/filepath/file_size を WebP のものへ更新して元 PNG を削除する。
+    cache.db の filename/filepath/file_size/file_mtime を WebP のものへ更新して元 PNG を削除する。
     変換に失敗したファイルは PNG のまま残してスキップする。
 
     Args:
@@ -258,7 +258,8 @@ def convert_screenshots(
                 result.skipped += 1
                 continue
 
-            after = dst.stat().st_size
+            dst_stat = dst.stat()
+            after = dst_stat.st_size
             new_filename = dst.name
             new_filepath = str(dst.relative_to(screenshot_dir))
 
@@ -270,8 +271,8 @@ def convert_screenshots(
                 # cache.db を WebP のメタデータへ更新（filename は PRIMARY KEY）
                 conn.execute(
                     "UPDATE screenshot_metadata "
-                    "SET filename = ?, filepath = ?, file_size = ? WHERE filename = ?",
-                    (new_filename, new_filepath, after, row["filename"]),
+                    "SET filename = ?, filepath = ?, file_size = ?, file_mtime = ? WHERE filename = ?",
+                    (new_filename, new_filepath, after, dst_stat.st_mtime, row["filename"]),
                 )
                 conn.commit()
             except sqlite3.IntegrityError:
@@ -23,6 +23,9 @@ import rsudp.quake.database
 _JMA_LIST_URL = "https://www.jma.go.jp/bosai/quake/data/list.json"
 _JMA_DETAIL_URL = "https://www.jma.go.jp/bosai/quake/data/{json_file}"
 
+# Coordinate format: +/-lat+/-lon-depth or +/-lat+/-lon+depth
+_COORDINATE_RE = re.compile(r"([+-][\d.]+)([+-][\d.]+)([+-]\d+)")
+
 
 class InvalidCoordinateError(ValueError):
     """Invalid coordinate format error."""
@@ -43,9 +46,7 @@ def _parse_coordinate(coord_str: str) -> tuple[float, float, int]:
     coord_str = coord_str.rstrip("/")
 
     # Parse coordinates using regex
-    # Format: +/-lat+/-lon-depth or +/-lat+/-lon+depth
-    pattern = r"([+-][\d.]+)([+-][\d.]+)([+-]\d+)"
-    match = re.match(pattern, coord_str)
+    match = _COORDINATE_RE.match(coord_str)
 
     if not match:
         raise InvalidCoordinateError(coord_str)
@@ -15,6 +15,9 @@ import rsudp.config
 import rsudp.schema_util
 import rsudp.types
 
+# detected_at の UNIX エポック秒。idx_earthquakes_detected_epoch の式と同一にしておく
+_DETECTED_EPOCH_SQL = "CAST(strftime('%s', detected_at) AS INTEGER)"
+
 
 class QuakeDatabase:
     """地震データの SQLite ストレージを管理するクラス."""
@@ -35,6 +38,20 @@ class QuakeDatabase:
         with sqlite3.connect(self.db_path) as conn:
             rsudp.schema_util.init_database(conn, "earthquakes")
             self._migrate_detected_at_to_utc(conn)
+            self._create_detected_epoch_index(conn)
+
+    @staticmethod
+    def _create_detected_epoch_index(conn: sqlite3.Connection) -> None:
+        """
+        detected_at の UNIX エポック秒に対する式インデックスを作成する.
+
+        cache.db から quake.db を ATTACH して時間窓で結合するクエリ
+        （ScreenshotManager の _QUAKE_EPOCH_SQL）が範囲検索に使う。
+        式はクエリ側と同一でなければ使われない。既に存在する場合は何もしない（冪等）。
+        """
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_earthquakes_detected_epoch ON earthquakes({_DETECTED_EPOCH_SQL})"
+        )
 
     @staticmethod
     def _migrate_detected_at_to_utc(conn: sqlite3.Connection) -> None:
@@ -51,12 +68,11 @@ class QuakeDatabase:
         if not rows:
             return
 
+        updates = []
         for row_id, detected_at_str in rows:
             detected_at_utc = datetime.datetime.fromisoformat(detected_at_str).astimezone(datetime.UTC)
-            conn.execute(
-                "UPDATE earthquakes SET detected_at = ? WHERE id = ?",
-                (detected_at_utc.isoformat(), row_id),
-            )
+            updates.append((detected_at_utc.isoformat(), row_id))
+        conn.executemany("UPDATE earthquakes SET detected_at = ? WHERE id = ?", updates)
         conn.commit()
         logging.info("quake.db マイグレーション: %d 件の detected_at を UTC に正規化しました", len(rows))
 
@@ -144,26 +160,22 @@ class QuakeDatabase:
             EarthquakeData、または見つからない場合は None
 
         """
-        # 地震データを取得
-        earthquakes = self.get_all_earthquakes(limit=1000)
-
-        # Python で時間範囲の比較を行う（タイムゾーン情報付き datetime で正しく比較）
-        best_match: rsudp.types.EarthquakeData | None = None
-        best_diff: float | None = None
-
-        for eq in earthquakes:
-            start_time, end_time = rsudp.types.calculate_earthquake_time_range(
-                eq.detected_at, before_seconds, after_seconds
-            )
-            if start_time <= timestamp <= end_time:
-                # 時間差の絶対値を計算
-                detected_at = datetime.datetime.fromisoformat(eq.detected_at)
-                diff = abs((timestamp - detected_at).total_seconds())
-                if best_diff is None or diff < best_diff:
-                    best_diff = diff
-                    best_match = eq
-
-        return best_match
+        # 時間窓に入る地震を式インデックスで範囲検索し、発生時刻が最も近いもの
+        # （同距離なら発生時刻が遅い方）を 1 件だけ取得する
+        timestamp_epoch = timestamp.timestamp()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(
+                f"""
+                SELECT * FROM earthquakes
+                WHERE {_DETECTED_EPOCH_SQL} BETWEEN ? AND ?
+                ORDER BY ABS(? - {_DETECTED_EPOCH_SQL}), {_DETECTED_EPOCH_SQL} DESC
+                LIMIT 1
+            """,  # noqa: S608 - 式は定数
+                (timestamp_epoch - after_seconds, timestamp_epoch + before_seconds, timestamp_epoch),
+            ).fetchone()
+
+        return rsudp.types.EarthquakeData(**dict(row)) if row is not None else None
 
     def get_all_earthquakes(self, limit: int = 100) -> list[rsudp.types.EarthquakeData]:
         """すべての地震データを発生時刻の降順で取得する."""
@@ -6,81 +6,209 @@
     - 比較時は datetime オブジェクト同士で比較し、タイムゾーンを正しく考慮する
 """
 
+import collections.abc
+import concurrent.futures
+import contextlib
+import dataclasses
 import datetime
+import errno
 import logging
+import os
 import re
 import shutil
 import sqlite3
+import struct
+import threading
 import typing
+import weakref
+import zlib
 from pathlib import Path
 
-import PIL.Image
-
 import rsudp.config
 import rsudp.schema_util
 import rsudp.types
 
-_T = typing.TypeVar("_T")
+# quake.earthquakes（別名 q）の detected_at を UNIX エポック秒に変換する式。
+# quake.db の式インデックス idx_earthquakes_detected_epoch と同一の式にすること。
+_QUAKE_EPOCH_SQL = "CAST(strftime('%s', q.detected_at) AS INTEGER)"
 
-# 地震マッチング候補: (時間窓開始, 時間窓終了, 発生時刻, ペイロード)
-EarthquakeCandidate = tuple[datetime.datetime, datetime.datetime, datetime.datetime, _T]
+# スクリーンショット（別名 s）を時間窓 [発生時刻 - before, 発生時刻 + after] に入る地震と結合する。
+# パラメータは (after_seconds, before_seconds) の順。quake.db の式インデックスで範囲検索される
+_EARTHQUAKE_WINDOW_JOIN_SQL = (
+    f"JOIN quake.earthquakes q ON {_QUAKE_EPOCH_SQL} BETWEEN s.timestamp_epoch - ? AND s.timestamp_epoch + ?"
+)
 
+# 時間窓が重なる（余震など）場合に、発生時刻が最も近い地震（同距離なら発生時刻が遅い方）を
+# スクリーンショットごとに 1 件選ぶための順位。関連付けの 3 経路で同じ規則を使う
+_EARTHQUAKE_MATCH_RANK_SQL = (
+    "ROW_NUMBER() OVER ("
+    f"PARTITION BY s.filename ORDER BY ABS(s.timestamp_epoch - {_QUAKE_EPOCH_SQL}), {_QUAKE_EPOCH_SQL} DESC"
+    ") AS match_rank"
+)
 
-def _build_earthquake_candidates(
-    earthquakes: list[tuple[str, _T]],
-    before_seconds: int,
-    after_seconds: int,
-) -> list[EarthquakeCandidate[_T]]:
-    """
-    地震ごとのマッチング候補（時間窓と発生時刻）を構築する.
+# スキャン時にまとめて INSERT する行数（1 トランザクション内で分割して executemany する）
+_CACHE_BATCH_SIZE = 500
 
-    Args:
-        earthquakes: (detected_at 文字列, ペイロード) のリスト
-        before_seconds: 地震発生前の許容秒数
-        after_seconds: 地震発生後の許容秒数
+# メタデータ抽出を並行して行うスレッド数の上限（処理の大半はファイル読み込み待ち）
+_METADATA_WORKERS = min(8, os.cpu_count() or 1)
 
-    Returns:
-        (開始時刻, 終了時刻, 発生時刻 datetime, ペイロード) のリスト
+# キャッシュ DB 接続のページキャッシュ（KiB）と mmap サイズ。
+# Raspberry Pi でも常駐させられるよう控えめにする（接続ごとに確保される上限値）
+_CACHE_SIZE_KIB = 16 * 1024
+_MMAP_SIZE_BYTES = 64 * 1024 * 1024
+
+# 他の接続（スキャン中の書き込みや cleaner）がロックを持っている間に待つ時間（ミリ秒）
+_BUSY_TIMEOUT_MS = 5000
+
+# スクリーンショットとして扱う画像の拡張子
+_IMAGE_SUFFIXES = (".png", ".webp")
 
+# キャッシュ対象のファイル（スキャン時は stat 結果を保持する os.DirEntry をそのまま渡す）
+_ImageFile = Path | os.DirEntry[str]
+
+# get_signal_statistics() のメモ化で保持する条件（クエリ）の数
+_STATS_CACHE_SIZE = 16
+
+# 使い終わったキャッシュ DB 接続をプールに残す数（超えた分は閉じる）
+_CONNECTION_POOL_SIZE = 4
+
+
+class _CacheConnection(sqlite3.Connection):
     """
-    candidates: list[EarthquakeCandidate[_T]] = []
-    for detected_at_str, payload in earthquakes:
-        start_time, end_time = rsudp.types.calculate_earthquake_time_range(
-            detected_at_str, before_seconds, after_seconds
-        )
-        detected_at = datetime.datetime.fromisoformat(detected_at_str)
-        candidates.append((start_time, end_time, detected_at, payload))
-    return candidates
+    最後に確認した PRAGMA data_version を保持するキャッシュ DB 接続.
+
+    data_version の値は接続ごとに独立しているため、接続をまたいだ比較はせず、
+    接続ごとに前回の値からの変化だけを見る。
+    """
+
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.seen_data_version: int | None = None
+
+
+def _close_connections(pool: list[sqlite3.Connection]) -> None:
+    """プールに残っている接続をすべて閉じる."""
+    while pool:
+        pool.pop().close()
+
+
+# PNG のシグネチャとチャンクヘッダ（長さ, 種別）。メタデータはテキストチャンクから直接読む
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_CHUNK_HEADER = struct.Struct(">I4s")
+_PNG_TEXT_CHUNK_TYPES = (b"tEXt", b"zTXt", b"iTXt")
+_PNG_TEXT_KEYWORDS = (b"Description", b"Comment")
+# 最初に 1 回の read で読み込む先頭部分のサイズ。matplotlib の出力ではテキストチャンクは
+# IDAT より前の数百バイトに収まるため、通常はこの範囲だけで読み終わる
+_PNG_PREFIX_SIZE = 16 * 1024
+
+# Description に埋め込まれた計測値（例: "STA=1.5, LTA=2.5, STA/LTA=0.6, MaxCount=1234"）。
+# "STA/LTA" を先に置き、その一部の "LTA=" が LTA として拾われないようにする
+_METADATA_VALUE_RE = re.compile(r"(STA/LTA|STA|LTA|MaxCount)=([0-9.]+)")
+_METADATA_VALUE_KEYS = {"STA": "sta", "LTA": "lta", "STA/LTA": "sta_lta_ratio", "MaxCount": "max_count"}
+
+
+def _to_epoch(timestamp_str: str) -> int:
+    """タイムゾーン情報付き ISO 形式文字列を UNIX エポック秒に変換する."""
+    return int(datetime.datetime.fromisoformat(timestamp_str).timestamp())
+
+
+def _decode_png_text(chunk_type: bytes, body: bytes) -> str:
+    """キーワードと区切りの NUL を除いたテキストチャンクの本体を文字列に復号する."""
+    if chunk_type == b"tEXt":
+        return body.decode("latin-1")
+    if chunk_type == b"zTXt":
+        # 先頭 1 バイトは圧縮方式（0 = zlib のみ定義されている）
+        return zlib.decompress(body[1:]).decode("latin-1")
+
+    # iTXt: 圧縮フラグ, 圧縮方式, 言語タグ NUL, 翻訳キーワード NUL, 本文（UTF-8）
+    is_compressed = body[0] != 0
+    _language, _, rest = body[2:].partition(b"\x00")
+    _translated_keyword, _, text = rest.partition(b"\x00")
+    if is_compressed:
+        text = zlib.decompress(text)
+    return text.decode("utf-8")
 
 
-def _find_closest_earthquake(
-    screenshot_ts: datetime.datetime,
-    candidates: list[EarthquakeCandidate[_T]],
-) -> _T | None:
+def _read_png_text_chunks(file_path: Path) -> dict[str, str] | None:
     """
-    時間窓内で detected_at がスクリーンショット時刻に最も近い地震のペイロードを返す.
+    PNG のテキストチャンク（tEXt / zTXt / iTXt）から Description と Comment を読み取る.
 
-    余震などで複数の時間窓（-30〜+240秒）が重なる場合でも、常に発生時刻が
-    最も近い地震を一意に選ぶことで、関連付けの 3 経路で結果を統一する。
+    Pillow で画像を開くと全チャンクの検証やプラグインの初期化が行われるため、
+    画素データ（IDAT）より前のチャンクだけを直接読んでメタデータを取得する。
+    ファイル先頭の _PNG_PREFIX_SIZE バイトを 1 回の read で読み込んでメモリ上で走査し、
+    テキストチャンクがその範囲を超える場合のみ続きをファイルから順に読む。
 
     Args:
-        screenshot_ts: スクリーンショットのタイムスタンプ（タイムゾーン情報付き）
-        candidates: _build_earthquake_candidates() で構築したマッチング候補
+        file_path: 画像ファイルのパス
 
     Returns:
-        最も近い地震のペイロード、または該当なしの場合は None
+        キーワードをキーとするテキストの辞書、または PNG でない場合は None
 
     """
-    best: _T | None = None
-    best_diff: float | None = None
-    for start_time, end_time, detected_at, payload in candidates:
-        if not (start_time <= screenshot_ts <= end_time):
-            continue
-        diff = abs((screenshot_ts - detected_at).total_seconds())
-        if best_diff is None or diff < best_diff:
-            best_diff = diff
-            best = payload
-    return best
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        prefix = os.read(fd, _PNG_PREFIX_SIZE)
+    finally:
+        os.close(fd)
+
+    if not prefix.startswith(_PNG_SIGNATURE):
+        return None
+
+    texts: dict[str, str] = {}
+    offset = len(_PNG_SIGNATURE)
+    # 先頭部分がファイル全体より短い場合のみ、範囲外のチャンクを続きから読む必要がある
+    is_partial = len(prefix) == _PNG_PREFIX_SIZE
+
+    while True:
+        if offset + _PNG_CHUNK_HEADER.size > len(prefix):
+            if is_partial:
+                return _read_png_text_chunks_from(file_path, offset, texts)
+            break
+        length, chunk_type = _PNG_CHUNK_HEADER.unpack_from(prefix, offset)
+        if chunk_type in (b"IDAT", b"IEND"):
+            break
+
+        data_start = offset + _PNG_CHUNK_HEADER.size
+        if chunk_type in _PNG_TEXT_CHUNK_TYPES:
+            if is_partial and data_start + length > len(prefix):
+                return _read_png_text_chunks_from(file_path, offset, texts)
+            _add_png_text(texts, chunk_type, prefix[data_start : data_start + length])
+
+        # チャンク本体と CRC（4 バイト）を読み飛ばす
+        offset = data_start + length + 4
+
+    return texts
+
+
+def _read_png_text_chunks_from(file_path: Path, offset: int, texts: dict[str, str]) -> dict[str, str]:
+    """_read_png_text_chunks の続きとして、offset のチャンクからファイルを順に読んでテキストを集める."""
+    with file_path.open("rb") as f:
+        f.seek(offset)
+        while True:
+            header = f.read(_PNG_CHUNK_HEADER.size)
+            if len(header) < _PNG_CHUNK_HEADER.size:
+                break
+            length, chunk_type = _PNG_CHUNK_HEADER.unpack(header)
+            if chunk_type in (b"IDAT", b"IEND"):
+                break
+            if chunk_type not in _PNG_TEXT_CHUNK_TYPES:
+                # チャンク本体と CRC（4 バイト）を読み飛ばす
+                f.seek(length + 4, os.SEEK_CUR)
+                continue
+
+            data = f.read(length)
+            f.seek(4, os.SEEK_CUR)
+            _add_png_text(texts, chunk_type, data)
+
+    return texts
+
+
+def _add_png_text(texts: dict[str, str], chunk_type: bytes, data: bytes) -> None:
+    """テキストチャンクのデータが対象キーワードなら texts に追加する."""
+    keyword, _, body = data.partition(b"\x00")
+    if keyword in _PNG_TEXT_KEYWORDS:
+        # Pillow と同じく、同じキーワードが複数ある場合は後のチャンクを採用する
+        texts[keyword.decode("latin-1")] = _decode_png_text(chunk_type, body)
 
 
 class ScreenshotManager:
@@ -95,18 +223,123 @@ class ScreenshotManager:
         # 直近のスキャンで新規追加されたファイル名（地震検出通知の代表選出に使用）
         self._last_scanned_files: list[str] = []
 
+        # 使い終わったキャッシュ DB 接続のプール（Web UI はリクエストごとに別スレッドから呼び出す）
+        self._pool: list[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+        self._closed = False
+        # close() が呼ばれないまま破棄・終了した場合も接続を閉じる
+        weakref.finalize(self, _close_connections, self._pool)
+
+        # 統計情報のメモ（Web UI はリクエストごとに別スレッドから呼び出すため、全スレッドで共有する）
+        self._stats_cache: dict[tuple, tuple[tuple, rsudp.types.SignalStatistics]] = {}
+        self._stats_lock = threading.Lock()
+        # 他の接続によるコミットを検知するたびに増やす世代番号
+        self._data_generation = 0
+
+        # このマネージャー経由の書き込み回数（統計情報のメモ化の無効化に使用）
+        self._write_version = 0
+
         # キャッシュディレクトリを作成
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
 
         # データベースを初期化
         self._init_database()
 
+    @contextlib.contextmanager
+    def _connect(self) -> collections.abc.Iterator[_CacheConnection]:
+        """
+        キャッシュ DB 接続をプールから借りる（プールが空なら新しく開く）.
+
+        接続を使い回すことで、呼び出しごとのスキーマ読み込みや PRAGMA の設定を省き、
+        ページキャッシュも呼び出しをまたいで再利用する。ブロック内はトランザクションとして
+        扱い、抜けるときにコミット（例外時はロールバック）してから接続をプールに返す。
+        プールに残す接続は _CONNECTION_POOL_SIZE 個までで、超えた分は閉じる。
+        """
+        with self._pool_lock:
+            conn = self._pool.pop() if self._pool else None
+        if conn is None:
+            conn = self._open_connection()
+
+        try:
+            with conn:
+                yield conn
+        finally:
+            with self._pool_lock:
+                if not self._closed and len(self._pool) < _CONNECTION_POOL_SIZE:
+                    self._pool.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def close(self) -> None:
+        """プールしているキャッシュ DB 接続を閉じる（貸し出し中の接続は返却時に閉じる）."""
+        with self._pool_lock:
+            self._closed = True
+            _close_connections(self._pool)
+
+    def _open_connection(self) -> _CacheConnection:
+        """
+        キャッシュ DB への接続を開き、接続単位の PRAGMA を設定する.
+
+        WAL モードでは synchronous=NORMAL でもコミット済みデータの整合性は保たれ、
+        コミットごとの fsync を省ける（電源断時に失われ得るのは直近のコミットのみで、
+        キャッシュはファイルから再構築できる）。
+        """
+        # プールした接続は借りたスレッドで使うため、作成スレッド以外からの利用を許可する
+        # （同時に使うのは常に 1 スレッドだけ）
+        conn = sqlite3.connect(self.cache_path, check_same_thread=False, factory=_CacheConnection)
+        conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA cache_size=-{_CACHE_SIZE_KIB}")
+        conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE_BYTES}")
+        return conn
+
     def _init_database(self):
         """メタデータキャッシュ用の SQLite データベースを初期化する."""
-        with sqlite3.connect(self.cache_path) as conn:
+        with self._connect() as conn:
+            # WAL はデータベースファイルに永続化されるため初期化時に 1 回だけ設定する。
+            # スキャン（書き込み）中も Web UI の一覧・統計（読み取り）がブロックされなくなる
+            conn.execute("PRAGMA journal_mode=WAL")
+
+            # 既存テーブルへの列追加は、その列を参照するインデックスの作成より先に行う
+            self._migrate_add_columns(conn)
             rsudp.schema_util.init_database(conn, "screenshot_metadata")
             self._migrate_drop_date_columns(conn)
 
+            # earthquake_event_id 単独のインデックスは (earthquake_event_id, max_count) の
+            # 複合インデックスに置き換えた（地震関連の統計をテーブルを読まずに集計できる）
+            conn.execute("DROP INDEX IF EXISTS idx_screenshot_earthquake")
+
+    # 後から追加した列とその定義（既存 DB には ALTER TABLE で追加する）
+    _ADDED_COLUMNS: typing.ClassVar[dict[str, str]] = {
+        # timestamp（UTC の ISO 文字列）から SQLite が導出する VIRTUAL 生成列
+        "timestamp_epoch": (
+            "INTEGER GENERATED ALWAYS AS (CAST(strftime('%s', timestamp) AS INTEGER)) VIRTUAL"
+        ),
+        # スキャン時の変更検知に使うファイル更新時刻（旧行は NULL のままサイズのみで判定）
+        "file_mtime": "REAL",
+    }
+
+    @classmethod
+    def _migrate_add_columns(cls, conn: sqlite3.Connection) -> None:
+        """
+        後から追加した列を既存の screenshot_metadata テーブルに追加するマイグレーション.
+
+        いずれも既存行の書き換えが不要な列（生成列または NULL 許容列）のみを対象とする。
+        テーブルが未作成、または列が存在する場合は何もしない（冪等）。
+        """
+        columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(screenshot_metadata)")}
+        if not columns:
+            return
+
+        added = [name for name in cls._ADDED_COLUMNS if name not in columns]
+        for name in added:
+            conn.execute(f"ALTER TABLE screenshot_metadata ADD COLUMN {name} {cls._ADDED_COLUMNS[name]}")
+        if added:
+            conn.commit()
+            logging.info("cache.db マイグレーション: 列 %s を追加しました", added)
+
     @staticmethod
     def _migrate_drop_date_columns(conn: sqlite3.Connection) -> None:
         """
@@ -129,112 +362,240 @@ class ScreenshotManager:
         logging.info("cache.db マイグレーション: 日付列 %s を削除しました", legacy_columns)
 
     @staticmethod
-    def _iter_images(directory: Path, *, recursive: bool = False):
-        """PNG/WebP のスクリーンショットファイルを列挙する."""
-        glob_fn = directory.rglob if recursive else directory.glob
-        yield from glob_fn("*.png")
-        yield from glob_fn("*.webp")
+    def _iter_images(
+        directory: Path, *, recursive: bool = False
+    ) -> collections.abc.Iterator[os.DirEntry[str]]:
+        """
+        PNG/WebP のスクリーンショットファイルを列挙する.
+
+        os.scandir のエントリを返すため、ファイル種別の判定はディレクトリ読み出しの結果で済み、
+        stat() の結果もエントリにキャッシュされる（呼び出し側で Path を作って再度 stat しない）。
+        """
+        subdirs: list[str] = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(_IMAGE_SUFFIXES) and entry.is_file():
+                    yield entry
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+
+        # サブディレクトリは親のハンドルを閉じてから辿る（深い階層でも同時に開くのは 1 つ）
+        for subdir in subdirs:
+            yield from ScreenshotManager._iter_images(Path(subdir), recursive=True)
 
     def organize_files(self):
         """スクリーンショットファイルを日付ベースのサブディレクトリに整理する."""
         if not self.screenshot_path.exists():
             return
 
-        # ルートディレクトリ内のすべての画像ファイルを取得
-        for file_path in self._iter_images(self.screenshot_path):
-            if not file_path.is_file():
-                continue
+        moved: list[_ImageFile] = []
+        # 作成済みの日付ディレクトリ（同じ日のファイルが続くため mkdir を繰り返さない）
+        date_dirs: set[Path] = set()
 
+        # ルートディレクトリ内のすべての画像ファイルを取得
+        for entry in self._iter_images(self.screenshot_path):
             # ファイル名から日付を解析
-            parsed = rsudp.types.parse_filename(file_path.name)
+            parsed = rsudp.types.parse_filename(entry.name)
             if not parsed:
                 continue
 
             # 日付ベースのサブディレクトリを作成 (YYYY/MM/DD)
             date_dir = self.screenshot_path / str(parsed.year) / f"{parsed.month:02d}" / f"{parsed.day:02d}"
-            date_dir.mkdir(parents=True, exist_ok=True)
+            if date_dir not in date_dirs:
+                date_dir.mkdir(parents=True, exist_ok=True)
+                date_dirs.add(date_dir)
 
             # ファイルをサブディレクトリに移動
-            new_path = date_dir / file_path.name
+            new_path = date_dir / entry.name
             if not new_path.exists():
-                shutil.move(file_path, new_path)
+                # 移動先は同じツリー内なので通常は rename 1 回で済む。
+                # サブディレクトリが別のファイルシステムの場合のみコピーで移動する
+                try:
+                    Path(entry.path).replace(new_path)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    shutil.move(entry.path, new_path)
+
+                moved.append(new_path)
 
-                # キャッシュを新しいファイル位置で更新
-                self._cache_file_metadata(new_path)
+        # 移動したファイルのキャッシュを新しいファイル位置でまとめて更新（1 トランザクション）
+        if moved:
+            self._cache_files(moved)
 
     def _extract_metadata(self, file_path: Path) -> dict:
         """PNG ファイルから STA 値などのメタデータを抽出する."""
         metadata = {}
 
         try:
-            with PIL.Image.open(file_path) as img:
-                info = img.info
-
-                # PNG メタデータの Description フィールドを確認
-                description = info.get("Description", "")
-
-                if description:
-                    metadata["raw"] = description
-
-                    # STA, LTA, ratio, MaxCount の値を解析
-                    sta_match = re.search(r"STA=([0-9.]+)", description)
-                    lta_match = re.search(r"LTA=([0-9.]+)", description)
-                    ratio_match = re.search(r"STA/LTA=([0-9.]+)", description)
-                    max_count_match = re.search(r"MaxCount=([0-9.]+)", description)
-
-                    if sta_match:
-                        metadata["sta"] = float(sta_match.group(1))
-                    if lta_match:
-                        metadata["lta"] = float(lta_match.group(1))
-                    if ratio_match:
-                        metadata["sta_lta_ratio"] = float(ratio_match.group(1))
-                    if max_count_match:
-                        metadata["max_count"] = float(max_count_match.group(1))
-
-                # Description がない場合は Comment フィールドも確認
-                if not description and "Comment" in info:
-                    comment = info.get("Comment", "")
-                    if comment and "raw" not in metadata:
-                        metadata["comment"] = comment
+            info = _read_png_text_chunks(file_path)
+            if info is None:
+                # PNG 以外（WebP 等）は Pillow で開く。Pillow の import は重いため、
+                # 実際に必要になるまで遅延させる（Web UI などクエリ系の用途では払わない）
+                import PIL.Image
+
+                with PIL.Image.open(file_path) as img:
+                    info = img.info
+
+            # PNG メタデータの Description フィールドを確認
+            description = info.get("Description", "")
+
+            if description:
+                metadata["raw"] = description
+
+                # STA, LTA, ratio, MaxCount の値を 1 回の走査で解析（同じキーは最初の値を採用）
+                for key, value in _METADATA_VALUE_RE.findall(description):
+                    metadata.setdefault(_METADATA_VALUE_KEYS[key], float(value))
+
+            # Description がない場合は Comment フィールドも確認
+            if not description and "Comment" in info:
+                comment = info.get("Comment", "")
+                if comment and "raw" not in metadata:
+                    metadata["comment"] = comment
 
         except Exception:
             logging.exception("メタデータの抽出に失敗: %s", file_path)
 
         return metadata
 
-    def _cache_file_metadata(self, file_path: Path):
-        """ファイルのメタデータを SQLite データベースにキャッシュする."""
-        if not file_path.exists():
-            return
+    # 既存行は UPDATE する（INSERT OR REPLACE だと行が削除・再挿入され、列リストに無い
+    # earthquake_event_id が NULL に戻って地震との関連付けが失われる）。
+    # timestamp はファイル名から決まるため、再スキャンしても関連付けは有効なまま。
+    # 内容が変わらない行は WHERE で更新自体を省き、行とインデックスの書き換えを避ける
+    _CACHE_INSERT_SQL = """
+        INSERT INTO screenshot_metadata
+        (filename, filepath, timestamp, sta_value, lta_value, sta_lta_ratio, max_count,
+         created_at, file_size, file_mtime, metadata_raw)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(filename) DO UPDATE SET
+            filepath = excluded.filepath,
+            timestamp = excluded.timestamp,
+            sta_value = excluded.sta_value,
+            lta_value = excluded.lta_value,
+            sta_lta_ratio = excluded.sta_lta_ratio,
+            max_count = excluded.max_count,
+            created_at = excluded.created_at,
+            file_size = excluded.file_size,
+            file_mtime = excluded.file_mtime,
+            metadata_raw = excluded.metadata_raw
+        WHERE filepath IS NOT excluded.filepath
+            OR timestamp IS NOT excluded.timestamp
+            OR sta_value IS NOT excluded.sta_value
+            OR lta_value IS NOT excluded.lta_value
+            OR sta_lta_ratio IS NOT excluded.sta_lta_ratio
+            OR max_count IS NOT excluded.max_count
+            OR created_at IS NOT excluded.created_at
+            OR file_size IS NOT excluded.file_size
+            OR file_mtime IS NOT excluded.file_mtime
+            OR metadata_raw IS NOT excluded.metadata_raw
+    """
 
-        parsed = rsudp.types.parse_filename(file_path.name)
+    def _build_cache_row(self, file: _ImageFile) -> tuple | None:
+        """_CACHE_INSERT_SQL に渡す行タプルをファイルから構築する（対象外なら None）."""
+        parsed = rsudp.types.parse_filename(file.name)
         if not parsed:
-            return
+            return None
+
+        # DirEntry ならスキャン時に取得した stat を再利用する
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            return None
+
+        # 空ファイル（書き込み途中など）は登録しない。一覧に載せても画像 API は 404 を返すため、
+        # 一覧側で毎回サイズを確認する代わりに登録時に 1 度だけ除外する
+        # （未登録のままなので、書き込み完了後の次回スキャンで登録される）
+        if stat.st_size == 0:
+            return None
 
+        file_path = Path(file)
         metadata = self._extract_metadata(file_path)
-        stat = file_path.stat()
-
-        with sqlite3.connect(self.cache_path) as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO screenshot_metadata
-                (filename, filepath, timestamp, sta_value, lta_value, sta_lta_ratio, max_count,
-                 created_at, file_size, metadata_raw)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    file_path.name,
-                    str(file_path.relative_to(self.screenshot_path)),
-                    parsed.timestamp,
-                    metadata.get("sta"),
-                    metadata.get("lta"),
-                    metadata.get("sta_lta_ratio"),
-                    metadata.get("max_count"),
-                    stat.st_ctime,
-                    stat.st_size,
-                    metadata.get("raw"),
-                ),
-            )
+
+        return (
+            file.name,
+            str(file_path.relative_to(self.screenshot_path)),
+            parsed.timestamp,
+            metadata.get("sta"),
+            metadata.get("lta"),
+            metadata.get("sta_lta_ratio"),
+            metadata.get("max_count"),
+            stat.st_ctime,
+            stat.st_size,
+            stat.st_mtime,
+            metadata.get("raw"),
+        )
+
+    def _cache_files(self, file_paths: list[_ImageFile], conn: sqlite3.Connection | None = None) -> list[str]:
+        """
+        複数ファイルのメタデータを 1 トランザクションでまとめてキャッシュする.
+
+        メタデータ抽出と executemany を _CACHE_BATCH_SIZE 件ずつ交互に行うことで、
+        初回スキャンのように対象が多い場合でも全件分の行タプルを保持しない。
+        メタデータ抽出（ファイル読み込み）はスレッドプールで並行に行い、
+        DB への書き込みは呼び出し元スレッドが 1 つの接続でのみ行う。
+
+        Args:
+            file_paths: キャッシュ対象のファイルパス（または os.scandir のエントリ）のリスト
+            conn: 使用する接続（省略時はプールから借りた接続で実行し、最後にコミットする）
+
+        Returns:
+            実際にキャッシュしたファイル名のリスト（ファイル名が不正なものは除く）
+
+        """
+        if conn is None:
+            with self._connect() as conn:
+                return self._cache_files(file_paths, conn)
+
+        cached: list[str] = []
+        if not file_paths:
+            return cached
+
+        workers = min(_METADATA_WORKERS, len(file_paths))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(file_paths), _CACHE_BATCH_SIZE):
+                batch = file_paths[start : start + _CACHE_BATCH_SIZE]
+                rows = [row for row in executor.map(self._build_cache_row, batch) if row is not None]
+                conn.executemany(self._CACHE_INSERT_SQL, rows)
+                cached.extend(row[0] for row in rows)
+
+        if cached:
+            self._write_version += 1
+
+        return cached
+
+    def _load_file_fingerprints(self, since: str | None = None) -> dict[str, tuple[int, float | None]]:
+        """
+        キャッシュ済みファイルの {ファイル名: (サイズ, 更新時刻)} を 1 回の SELECT で取得する.
+
+        Args:
+            since: この UTC 日付（YYYY-MM-DD）以降のタイムスタンプの行のみ取得する（None の場合は全件）
+
+        Returns:
+            ファイル名からサイズ・更新時刻への辞書
+
+        """
+        query = "SELECT filename, file_size, file_mtime FROM screenshot_metadata"
+        params: tuple[str, ...] = ()
+        if since is not None:
+            # タイムスタンプは UTC の ISO 形式なので、日付文字列との比較で idx_screenshot_timestamp を使える
+            query += " WHERE timestamp >= ?"
+            params = (since,)
+
+        with self._connect() as conn:
+            cursor = conn.execute(query, params)
+            return {filename: (size, mtime) for filename, size, mtime in cursor}
+
+    @staticmethod
+    def _is_cached(file: _ImageFile, fingerprints: dict[str, tuple[int, float | None]]) -> bool:
+        """ファイルのサイズ・更新時刻がキャッシュと一致するか判定する."""
+        cached = fingerprints.get(file.name)
+        if cached is None:
+            return False
+
+        stat = file.stat()
+        size, mtime = cached
+        # 更新時刻を記録する前の行はサイズのみで判定する
+        return size == stat.st_size and mtime in (None, stat.st_mtime)
 
     def get_latest_cached_date(self) -> rsudp.types.DateInfo | None:
         """
@@ -247,7 +608,7 @@ class ScreenshotManager:
             最新の日付情報、またはキャッシュが空の場合は None
 
         """
-        with sqlite3.connect(self.cache_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 SELECT timestamp
                 FROM screenshot_metadata
@@ -271,30 +632,25 @@ class ScreenshotManager:
         if not self.screenshot_path.exists():
             return 0
 
-        self._last_scanned_files = []
-        new_count = 0
+        fingerprints = self._load_file_fingerprints()
+        pending: list[_ImageFile] = []
 
         # すべての画像ファイルを再帰的に取得
-        for file_path in self._iter_images(self.screenshot_path, recursive=True):
-            if not file_path.is_file():
+        for entry in self._iter_images(self.screenshot_path, recursive=True):
+            # キャッシュ済みでサイズ・更新時刻が変わっていなければスキップ
+            if self._is_cached(entry, fingerprints):
                 continue
 
-            # すでにキャッシュされているか確認
-            with sqlite3.connect(self.cache_path) as conn:
-                cursor = conn.execute(
-                    "SELECT file_size FROM screenshot_metadata WHERE filename = ?", (file_path.name,)
-                )
-                row = cursor.fetchone()
+            pending.append(entry)
 
-                # キャッシュ済みでファイルサイズが変わっていなければスキップ
-                if row and row[0] == file_path.stat().st_size:
-                    continue
+        with self._connect() as conn:
+            self._last_scanned_files = self._cache_files(pending, conn)
 
-            self._cache_file_metadata(file_path)
-            self._last_scanned_files.append(file_path.name)
-            new_count += 1
+            # 一括登録後は統計情報を更新し、クエリプランナーがインデックスを選べるようにする
+            if self._last_scanned_files:
+                conn.execute("ANALYZE screenshot_metadata")
 
-        return new_count
+        return len(self._last_scanned_files)
 
     def scan_incremental(self) -> int:
         """
@@ -318,8 +674,11 @@ class ScreenshotManager:
             logging.info("増分スキャン: キャッシュが空のため完全スキャンを実行")
             return self.scan_and_cache_all()
 
-        self._last_scanned_files = []
-        new_count = 0
+        # スキャン対象は最新日付以降のディレクトリのみなので、照合に使う行も同じ範囲に絞る
+        fingerprints = self._load_file_fingerprints(
+            f"{latest_date.year:04d}-{latest_date.month:02d}-{latest_date.day:02d}"
+        )
+        pending: list[_ImageFile] = []
 
         # 最新日付以降のディレクトリをスキャン
         # ディレクトリ構造: YYYY/MM/DD
@@ -348,52 +707,171 @@ class ScreenshotManager:
                         continue
 
                     # この日付のディレクトリ内のファイルをスキャン
-                    for file_path in self._iter_images(day_dir):
-                        if not file_path.is_file():
+                    for entry in self._iter_images(day_dir):
+                        # キャッシュ済みでサイズ・更新時刻が変わっていなければスキップ
+                        if self._is_cached(entry, fingerprints):
                             continue
 
-                        # すでにキャッシュされているか確認
-                        with sqlite3.connect(self.cache_path) as conn:
-                            cursor = conn.execute(
-                                "SELECT file_size FROM screenshot_metadata WHERE filename = ?",
-                                (file_path.name,),
-                            )
-                            row = cursor.fetchone()
+                        pending.append(entry)
 
-                            # キャッシュ済みでファイルサイズが変わっていなければスキップ
-                            if row and row[0] == file_path.stat().st_size:
-                                continue
-
-                        self._cache_file_metadata(file_path)
-                        self._last_scanned_files.append(file_path.name)
-                        new_count += 1
+        self._last_scanned_files = self._cache_files(pending)
+        new_count = len(self._last_scanned_files)
 
         if new_count > 0:
             logging.info("増分スキャン: %d件の新規ファイルを検出", new_count)
 
         return new_count
 
+    def iter_screenshots_with_signal_filter(
+        self,
+        min_max_signal: float | None = None,
+        *,
+        start: datetime.datetime | None = None,
+        end: datetime.datetime | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> collections.abc.Iterator[dict[str, typing.Any]]:
+        """
+        最小信号値（max_count）でフィルタリングしたスクリーンショットを順に返す.
+
+        結果をリストに展開せず、カーソルから1行ずつ読み出して返す。
+        ジェネレータが閉じられた時点でカーソルも閉じる。
+
+        Args:
+            min_max_signal: 最小 max_count 値（None の場合はフィルタなし）
+            start: この時刻以降のスクリーンショットのみ返す（タイムゾーン情報付き datetime）
+            end: この時刻より前のスクリーンショットのみ返す（タイムゾーン情報付き datetime）
+            limit: 返す最大件数（None の場合は制限なし）
+            offset: 先頭から読み飛ばす件数
+
+        Returns:
+            タイムスタンプ降順のスクリーンショット辞書のイテレータ
+
+        """
+        query = f"SELECT {self._METADATA_COLUMNS} FROM screenshot_metadata"  # noqa: S608 - 列名は定数
+        conditions = []
+        params: list[typing.Any] = []
+
+        if min_max_signal is not None:
+            conditions.append("max_count >= ?")
+            params.append(min_max_signal)
+        # 期間は idx_screenshot_timestamp_epoch で範囲検索する
+        if start is not None:
+            conditions.append("timestamp_epoch >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            conditions.append("timestamp_epoch < ?")
+            params.append(end.timestamp())
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        query += " ORDER BY timestamp DESC"
+
+        if limit is not None or offset:
+            # SQLite の OFFSET は LIMIT とセットでのみ書ける（負の LIMIT は無制限）
+            query += " LIMIT ? OFFSET ?"
+            params.extend((-1 if limit is None else limit, offset))
+
+        with self._connect() as conn:
+            cursor = conn.execute(query, params)
+            try:
+                yield from map(rsudp.types.row_to_screenshot_dict, cursor)
+            finally:
+                cursor.close()
+
     def get_screenshots_with_signal_filter(self, min_max_signal: float | None = None):
         """最小信号値（max_count）でフィルタリングしたスクリーンショットを取得する."""
-        with sqlite3.connect(self.cache_path) as conn:
-            query = f"SELECT {self._METADATA_COLUMNS} FROM screenshot_metadata"  # noqa: S608 - 列名は定数
-            params = []
+        return list(self.iter_screenshots_with_signal_filter(min_max_signal))
+
+    def get_screenshots_in_range(
+        self,
+        start: datetime.datetime | None,
+        end: datetime.datetime | None,
+        min_max_signal: float | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict[str, typing.Any]]:
+        """
+        期間と最小信号値で絞り込んだスクリーンショットをページ単位で取得する.
 
-            if min_max_signal is not None:
-                query += " WHERE max_count >= ?"
-                params.append(min_max_signal)
+        Args:
+            start: 期間の開始（この時刻を含む。None の場合は制限なし）
+            end: 期間の終了（この時刻を含まない。None の場合は制限なし）
+            min_max_signal: 最小 max_count 値（None の場合はフィルタなし）
+            limit: 取得する最大件数（None の場合は制限なし）
+            offset: 先頭から読み飛ばす件数
 
-            query += " ORDER BY timestamp DESC"
+        Returns:
+            タイムスタンプ降順のスクリーンショット辞書のリスト
 
-            cursor = conn.execute(query, params)
+        """
+        return list(
+            self.iter_screenshots_with_signal_filter(
+                min_max_signal, start=start, end=end, limit=limit, offset=offset
+            )
+        )
+
+    def get_screenshot_by_filename(self, filename: str) -> dict[str, typing.Any] | None:
+        """
+        ファイル名でスクリーンショットを 1 件取得する.
+
+        filename は主キーなので、全件を読まずにインデックスで引く。
+
+        Args:
+            filename: スクリーンショットのファイル名
+
+        Returns:
+            スクリーンショット辞書（見つからない場合は None）
+
+        """
+        query = f"SELECT {self._METADATA_COLUMNS} FROM screenshot_metadata WHERE filename = ?"  # noqa: S608 - 列名は定数
+        with self._connect() as conn:
+            row = conn.execute(query, (filename,)).fetchone()
 
-            return [rsudp.types.row_to_screenshot_dict(row) for row in cursor]
+        return rsudp.types.row_to_screenshot_dict(row) if row is not None else None
 
     @staticmethod
     def _attach_quake_db(conn: sqlite3.Connection, quake_db_path: Path) -> None:
-        """quake.db を `quake` スキーマとして接続に attach する."""
+        """
+        quake.db を `quake` スキーマとして接続に attach する.
+
+        接続は使い回すため、同じファイルが attach 済みなら何もしない。
+        別のファイルが attach されている場合は detach してから attach し直す。
+        """
+        attached = {name: file for _, name, file in conn.execute("PRAGMA database_list")}
+        if "quake" in attached:
+            if attached["quake"] == os.path.realpath(quake_db_path):
+                return
+            conn.execute("DETACH DATABASE quake")
         conn.execute("ATTACH DATABASE ? AS quake", (str(quake_db_path),))
 
+    def count_screenshots(self) -> int:
+        """キャッシュ済みスクリーンショットの総数を取得する."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM screenshot_metadata").fetchone()[0]
+
+    def _get_data_generation(self, conn: _CacheConnection) -> int:
+        """
+        他の接続によるコミットを反映した世代番号を取得する.
+
+        接続の data_version が前回確認時から変わっていれば世代番号を進める。
+        初めて確認する接続では、開く前のコミットを見逃さないよう常に進める。
+
+        Args:
+            conn: 使用中の接続
+
+        Returns:
+            世代番号
+
+        """
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        with self._stats_lock:
+            if data_version != conn.seen_data_version:
+                conn.seen_data_version = data_version
+                self._data_generation += 1
+            return self._data_generation
+
     def get_signal_statistics(
         self,
         *,
@@ -417,7 +895,7 @@ class ScreenshotManager:
                 MIN(s.max_count) as min_signal,
                 MAX(s.max_count) as max_signal,
                 AVG(s.max_count) as avg_signal,
-                COUNT(CASE WHEN s.max_count IS NOT NULL THEN 1 END) as with_signal
+                COUNT(s.max_count) as with_signal
             FROM screenshot_metadata s
         """
         params: list = []
@@ -435,18 +913,38 @@ class ScreenshotManager:
             else:
                 query += " WHERE s.earthquake_event_id IS NOT NULL"
 
-        with sqlite3.connect(self.cache_path) as conn:
+        with self._connect() as conn:
+            # Web UI がポーリングするため、DB が変わっていなければ前回の集計結果を返す。
+            # 他の接続（別スレッド・別プロセス）のコミットは data_version の世代番号で、
+            # プールした接続での書き込みは _write_version で検知する
+            version: tuple = (self._get_data_generation(conn), self._write_version)
+            cache_key: tuple = (query, tuple(params))
             if needs_quake_attach:
                 assert quake_db_path is not None  # noqa: S101 - type narrowing
                 self._attach_quake_db(conn, quake_db_path)
-            row = conn.execute(query, params).fetchone()
-            return rsudp.types.SignalStatistics(
-                total=row[0],
-                min_signal=row[1],
-                max_signal=row[2],
-                avg_signal=row[3],
-                with_signal=row[4],
-            )
+                quake_stat = quake_db_path.stat()
+                version += (quake_stat.st_mtime_ns, quake_stat.st_size)
+                cache_key += (str(quake_db_path),)
+
+            with self._stats_lock:
+                cached = self._stats_cache.get(cache_key)
+            if cached is not None and cached[0] == version:
+                # 呼び出し元が結果のフィールドを書き換えるため、コピーを返す
+                return dataclasses.replace(cached[1])
+
+            # 集計列の別名は SignalStatistics のフィールド名と一致させている
+            # （接続は使い回すため、row_factory はこのカーソルにだけ設定する）
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            row = cursor.execute(query, params).fetchone()
+            stats = rsudp.types.SignalStatistics(**dict(row))
+
+        with self._stats_lock:
+            # min_magnitude は任意の値を取り得るため、古いものから捨てて件数を抑える
+            if cache_key not in self._stats_cache and len(self._stats_cache) >= _STATS_CACHE_SIZE:
+                del self._stats_cache[next(iter(self._stats_cache))]
+            self._stats_cache[cache_key] = (version, stats)
+        return dataclasses.replace(stats)
 
     def get_screenshots_with_earthquake_filter(
         self,
@@ -471,46 +969,36 @@ class ScreenshotManager:
         if not quake_db_path or not quake_db_path.exists():
             return []
 
-        # 地震データを取得
-        with sqlite3.connect(quake_db_path) as quake_conn:
-            quake_conn.row_factory = sqlite3.Row
-            quake_cursor = quake_conn.execute("SELECT * FROM earthquakes ORDER BY detected_at DESC")
-            earthquakes = [rsudp.types.EarthquakeData(**dict(row)) for row in quake_cursor.fetchall()]
-
-        if not earthquakes:
-            return []
-
-        # 地震ごとのマッチング候補を作成（時間窓が最も近い地震を一意に選ぶため）
-        # detected_at はタイムゾーン情報を含む ISO 形式文字列（UTC）
-        candidates = _build_earthquake_candidates(
-            [(eq.detected_at, eq) for eq in earthquakes], before_seconds, after_seconds
-        )
-
-        # スクリーンショットを取得
-        with sqlite3.connect(self.cache_path) as conn:
-            query = f"SELECT {self._METADATA_COLUMNS} FROM screenshot_metadata"  # noqa: S608 - 列名は定数
-            params: list = []
-
-            if min_max_signal is not None:
-                query += " WHERE max_count >= ?"
-                params.append(min_max_signal)
+        # quake.db を ATTACH し、時間窓に入る地震との結合と最近傍の選択を 1 クエリで行う
+        conditions = ""
+        params: list = [after_seconds, before_seconds]
+        if min_max_signal is not None:
+            conditions = "WHERE s.max_count >= ?"
+            params.append(min_max_signal)
 
-            query += " ORDER BY timestamp DESC"
+        query = f"""
+            SELECT {self._METADATA_COLUMNS}, {self._EARTHQUAKE_COLUMNS}
+            FROM (
+                SELECT s.filename, s.filepath, s.timestamp,
+                       s.sta_value, s.lta_value, s.sta_lta_ratio, s.max_count, s.metadata_raw,
+                       {self._EARTHQUAKE_SELECT},
+                       {_EARTHQUAKE_MATCH_RANK_SQL}
+                FROM screenshot_metadata s
+                {_EARTHQUAKE_WINDOW_JOIN_SQL}
+                {conditions}
+            )
+            WHERE match_rank = 1
+            ORDER BY timestamp DESC
+        """  # noqa: S608 - 列名・条件式は定数
 
+        with self._connect() as conn:
+            self._attach_quake_db(conn, quake_db_path)
             cursor = conn.execute(query, params)
 
-            screenshots = []
-            for row in cursor:
-                # スクリーンショットのタイムスタンプ（UTC、タイムゾーン情報付き）を解析
-                screenshot_ts = datetime.datetime.fromisoformat(row[2])
-
-                # 時間窓内で発生時刻が最も近い地震を選ぶ（3 経路で統一）
-                matched_earthquake = _find_closest_earthquake(screenshot_ts, candidates)
-
-                if matched_earthquake:
-                    screenshots.append(rsudp.types.row_to_screenshot_dict(row, matched_earthquake))
-
-            return screenshots
+            return [
+                rsudp.types.row_to_screenshot_dict(row[:8], self._row_to_earthquake(row[8:]))
+                for row in cursor
+            ]
 
     def get_earthquake_for_screenshot(
         self,
@@ -535,20 +1023,22 @@ class ScreenshotManager:
         if not quake_db_path or not quake_db_path.exists():
             return None
 
-        # スクリーンショットのタイムスタンプを datetime オブジェクトに変換
-        screenshot_dt = datetime.datetime.fromisoformat(screenshot_timestamp)
+        # 時間窓内で発生時刻が最も近い地震（同距離なら発生時刻が遅い方）を選ぶ（3 経路で統一）
+        screenshot_ts = _to_epoch(screenshot_timestamp)
+        query = f"""
+            SELECT {self._EARTHQUAKE_SELECT}
+            FROM earthquakes q
+            WHERE {_QUAKE_EPOCH_SQL} BETWEEN ? AND ?
+            ORDER BY ABS(? - {_QUAKE_EPOCH_SQL}), {_QUAKE_EPOCH_SQL} DESC
+            LIMIT 1
+        """  # noqa: S608 - 列名・式は定数
 
-        # 地震データを取得
         with sqlite3.connect(quake_db_path) as quake_conn:
-            quake_conn.row_factory = sqlite3.Row
-            cursor = quake_conn.execute("SELECT * FROM earthquakes")
-            earthquakes = [rsudp.types.EarthquakeData(**dict(row)) for row in cursor.fetchall()]
+            row = quake_conn.execute(
+                query, (screenshot_ts - after_seconds, screenshot_ts + before_seconds, screenshot_ts)
+            ).fetchone()
 
-        # 時間窓内で発生時刻が最も近い地震を選ぶ（3 経路で統一）
-        candidates = _build_earthquake_candidates(
-            [(eq.detected_at, eq) for eq in earthquakes], before_seconds, after_seconds
-        )
-        return _find_closest_earthquake(screenshot_dt, candidates)
+        return self._row_to_earthquake(row) if row is not None else None
 
     def update_earthquake_associations(
         self,
@@ -574,44 +1064,31 @@ class ScreenshotManager:
         if not quake_db_path.exists():
             return 0
 
-        # 地震データを取得（detected_at は文字列のまま保持）
-        with sqlite3.connect(quake_db_path) as quake_conn:
-            quake_conn.row_factory = sqlite3.Row
-            quake_cursor = quake_conn.execute("SELECT event_id, detected_at FROM earthquakes")
-            earthquakes = [(row["event_id"], row["detected_at"]) for row in quake_cursor]
-
-        if not earthquakes:
-            return 0
-
-        # 地震ごとのマッチング候補を作成（ペイロードは event_id）
-        # 他の 2 経路と同じく「時間窓内で発生時刻が最も近い地震」を選ぶ
-        candidates = _build_earthquake_candidates(
-            [(detected_at_str, event_id) for event_id, detected_at_str in earthquakes],
-            before_seconds,
-            after_seconds,
-        )
-
-        updated_count = 0
-        with sqlite3.connect(self.cache_path) as conn:
-            # 全スクリーンショットのタイムスタンプを取得
-            cursor = conn.execute("SELECT filename, timestamp FROM screenshot_metadata")
-            rows = cursor.fetchall()
-
-            for filename, timestamp_str in rows:
-                screenshot_ts = datetime.datetime.fromisoformat(timestamp_str)
-
-                # 時間窓内で発生時刻が最も近い地震を選ぶ
-                matched_event_id = _find_closest_earthquake(screenshot_ts, candidates)
-
-                # 関連付けを更新
-                conn.execute(
-                    "UPDATE screenshot_metadata SET earthquake_event_id = ? WHERE filename = ?",
-                    (matched_event_id, filename),
+        # 他の 2 経路と同じく「時間窓内で発生時刻が最も近い地震」を選び、1 文の UPDATE で反映する
+        # （該当する地震が無いスクリーンショットは NULL になる）
+        query = f"""
+            WITH matches AS MATERIALIZED (
+                SELECT filename, event_id
+                FROM (
+                    SELECT s.filename, q.event_id, {_EARTHQUAKE_MATCH_RANK_SQL}
+                    FROM screenshot_metadata s
+                    {_EARTHQUAKE_WINDOW_JOIN_SQL}
                 )
-                if matched_event_id:
-                    updated_count += 1
+                WHERE match_rank = 1
+            )
+            UPDATE screenshot_metadata
+            SET earthquake_event_id = (
+                SELECT event_id FROM matches WHERE matches.filename = screenshot_metadata.filename
+            )
+        """  # noqa: S608 - 式は定数
 
-            conn.commit()
+        with self._connect() as conn:
+            self._attach_quake_db(conn, quake_db_path)
+            conn.execute(query, (after_seconds, before_seconds))
+            self._write_version += 1
+            updated_count = conn.execute(
+                "SELECT COUNT(*) FROM screenshot_metadata WHERE earthquake_event_id IS NOT NULL"
+            ).fetchone()[0]
 
         logging.info("地震関連付けを更新: %d 件のスクリーンショットが地震に関連付けられました", updated_count)
         return updated_count
@@ -637,14 +1114,13 @@ class ScreenshotManager:
         if not quake_db_path.exists():
             return []
 
-        query = """
+        query = f"""
             SELECT s.filename, s.filepath, s.timestamp,
                    s.sta_value, s.lta_value, s.sta_lta_ratio, s.max_count, s.metadata_raw,
-                   q.id, q.event_id, q.detected_at, q.latitude, q.longitude, q.magnitude,
-                   q.depth, q.epicenter_name, q.max_intensity, q.created_at, q.updated_at
+                   {self._EARTHQUAKE_SELECT}
             FROM screenshot_metadata s
             JOIN quake.earthquakes q ON s.earthquake_event_id = q.event_id
-        """
+        """  # noqa: S608 - 列名は定数
         conditions: list[str] = []
         params: list = []
         if min_max_signal is not None:
@@ -657,42 +1133,33 @@ class ScreenshotManager:
             query += " WHERE " + " AND ".join(conditions)
         query += " ORDER BY s.timestamp DESC"
 
-        with sqlite3.connect(self.cache_path) as conn:
+        with self._connect() as conn:
             self._attach_quake_db(conn, quake_db_path)
             cursor = conn.execute(query, params)
 
-            screenshots = []
-            for row in cursor:
-                earthquake = rsudp.types.EarthquakeData(
-                    id=row[8],
-                    event_id=row[9],
-                    detected_at=row[10],
-                    latitude=row[11],
-                    longitude=row[12],
-                    magnitude=row[13],
-                    depth=row[14],
-                    epicenter_name=row[15],
-                    max_intensity=row[16],
-                    created_at=row[17],
-                    updated_at=row[18],
-                )
-                screenshots.append(rsudp.types.row_to_screenshot_dict(row[:8], earthquake))
+            return [
+                rsudp.types.row_to_screenshot_dict(row[:8], self._row_to_earthquake(row[8:]))
+                for row in cursor
+            ]
 
-            return screenshots
+    # quake.earthquakes（別名 q）から取得する列（_row_to_earthquake() の引数の順序）
+    _EARTHQUAKE_COLUMNS = (
+        "id, event_id, detected_at, latitude, longitude, magnitude, "
+        "depth, epicenter_name, max_intensity, created_at, updated_at"
+    )
+    _EARTHQUAKE_FIELDS = tuple(_EARTHQUAKE_COLUMNS.split(", "))
+    _EARTHQUAKE_SELECT = ", ".join(f"q.{field}" for field in _EARTHQUAKE_FIELDS)
+
+    @classmethod
+    def _row_to_earthquake(cls, row: tuple) -> rsudp.types.EarthquakeData:
+        """_EARTHQUAKE_COLUMNS 順の行タプルを EarthquakeData に変換する."""
+        return rsudp.types.EarthquakeData(**dict(zip(cls._EARTHQUAKE_FIELDS, row, strict=True)))
 
     @staticmethod
     def _row_to_metadata(row: tuple) -> rsudp.types.ScreenshotMetadata:
         """_METADATA_COLUMNS 順の行タプルを ScreenshotMetadata に変換する."""
-        return rsudp.types.ScreenshotMetadata(
-            filename=row[0],
-            filepath=row[1],
-            timestamp=row[2],
-            sta=row[3],
-            lta=row[4],
-            sta_lta_ratio=row[5],
-            max_count=row[6],
-            metadata=row[7],
-        )
+        # SCREENSHOT_ROW_KEYS は ScreenshotMetadata のフィールド名と一致する
+        return rsudp.types.ScreenshotMetadata(**dict(zip(rsudp.types.SCREENSHOT_ROW_KEYS, row, strict=True)))
 
     _METADATA_COLUMNS = (
         "filename, filepath, timestamp, sta_value, lta_value, sta_lta_ratio, max_count, metadata_raw"
@@ -713,7 +1180,7 @@ class ScreenshotManager:
             f"SELECT {self._METADATA_COLUMNS} FROM screenshot_metadata "  # noqa: S608 - placeholders は "?" のみ
             f"WHERE filename IN ({placeholders}) ORDER BY max_count DESC LIMIT 1"
         )
-        with sqlite3.connect(self.cache_path) as conn:
+        with self._connect() as conn:
             row = conn.execute(query, self._last_scanned_files).fetchone()
 
         return self._row_to_metadata(row) if row is not None else None
@@ -731,7 +1198,7 @@ class ScreenshotManager:
             f"SELECT {self._METADATA_COLUMNS} FROM screenshot_metadata "  # noqa: S608 - 列名は定数
             "WHERE earthquake_event_id = ? ORDER BY max_count DESC LIMIT 1"
         )
-        with sqlite3.connect(self.cache_path) as conn:
+        with self._connect() as conn:
             row = conn.execute(query, (event_id,)).fetchone()
 
         return self._row_to_metadata(row) if row is not None else None
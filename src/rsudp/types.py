@@ -2,15 +2,17 @@
 型定義モジュール.
 
 フロントエンドの frontend/src/types.ts と整合する dataclass を定義する。
-API レスポンスでは dataclasses.asdict() で辞書に変換して使用する。
+API レスポンスでは dataclass_to_dict()（ネストを含む場合は dataclasses.asdict()）で
+辞書に変換して使用する。
 """
 
 from __future__ import annotations
 
 import dataclasses
 import datetime
+import functools
 import logging
-import re
+import typing
 import zoneinfo
 
 # 日本標準時 (JST) タイムゾーン
@@ -60,13 +62,14 @@ def calculate_earthquake_time_range(
     )
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
 class ParsedFilename:
     """
     スクリーンショットファイル名のパース結果.
 
     ファイル名フォーマット: PREFIX-YYYY-MM-DD-HHMMSS.{png,webp}
     タイムスタンプは UTC として解釈される。
+    parse_filename の結果はキャッシュされ呼び出し元で共有されるため不変にしている。
     """
 
     filename: str
@@ -80,11 +83,19 @@ class ParsedFilename:
     timestamp: str  # ISO 8601 形式 (UTC)
 
 
+# ファイル名末尾のタイムスタンプ部 "-YYYY-MM-DD-HHMMSS" の長さと、対応する拡張子
+_FILENAME_TIMESTAMP_LENGTH = 18
+_FILENAME_EXTENSIONS = ("png", "webp")
+
+
+@functools.lru_cache(maxsize=4096)
 def parse_filename(filename: str) -> ParsedFilename | None:
     """
     スクリーンショットのファイル名からタイムスタンプ情報を抽出する.
 
     ファイル名のタイムスタンプは UTC として解釈される。
+    整理（organize_files）とキャッシュ登録、Web UI の画像配信で同じファイル名を
+    繰り返し解析するため、結果をファイル名ごとにキャッシュする。
 
     Args:
         filename: スクリーンショットのファイル名（例: SHAKE-2025-08-12-104039.png / .webp）
@@ -93,36 +104,48 @@ def parse_filename(filename: str) -> ParsedFilename | None:
         ParsedFilename または None（パース失敗時）
 
     """
-    pattern = r"^(.+?)-(\d{4})-(\d{2})-(\d{2})-(\d{2})(\d{2})(\d{2})\.(?:png|webp)$"
-    match = re.match(pattern, filename)
+    # 末尾は固定長（-YYYY-MM-DD-HHMMSS + 拡張子）なので、正規表現を使わずスライスで切り出す
+    stem, dot, extension = filename.rpartition(".")
+    if not dot or extension not in _FILENAME_EXTENSIONS or len(stem) <= _FILENAME_TIMESTAMP_LENGTH:
+        return None
 
-    if not match:
+    prefix = stem[:-_FILENAME_TIMESTAMP_LENGTH]
+    tail = stem[-_FILENAME_TIMESTAMP_LENGTH:]
+    if tail[0] != "-" or tail[5] != "-" or tail[8] != "-" or tail[11] != "-":
         return None
 
-    prefix, year, month, day, hour, minute, second = match.groups()
+    year, month, day = tail[1:5], tail[6:8], tail[9:11]
+    hour, minute, second = tail[12:14], tail[14:16], tail[16:18]
+    if not (year + month + day + hour + minute + second).isdecimal():
+        return None
 
-    # 正規表現は桁数しか検証しないため、月13・時25 等の無効な日時が通過し得る。
-    # datetime 構築時の ValueError をここで握り、パース失敗（None）として扱う。
-    # これを捕捉しないと呼び出し元のスキャンが恒久停止する。
+    year_int, month_int, day_int = int(year), int(month), int(day)
+    hour_int, minute_int, second_int = int(hour), int(minute), int(second)
+
+    # ここまでは桁数しか検証しないため、月13・時25 等の無効な日時が通過し得る。
+    # 暦日（月末・うるう年）は datetime.date に検証させ、その ValueError をパース失敗（None）
+    # として扱う。これを捕捉しないと呼び出し元のスキャンが恒久停止する。
     try:
-        # ファイル名のタイムスタンプは UTC
-        timestamp_utc = datetime.datetime(
-            int(year), int(month), int(day), int(hour), int(minute), int(second), tzinfo=datetime.UTC
-        )
+        datetime.date(year_int, month_int, day_int)
     except ValueError:
         logging.warning("ファイル名の日時が不正なためスキップします: %s", filename)
         return None
+    if hour_int > 23 or minute_int > 59 or second_int > 59:
+        logging.warning("ファイル名の日時が不正なためスキップします: %s", filename)
+        return None
 
+    # ファイル名のタイムスタンプは UTC。各部分はゼロ埋め済みなので、datetime を経由せず
+    # datetime.isoformat() と同じ形式の文字列を組み立てる
     return ParsedFilename(
         filename=filename,
         prefix=prefix,
-        year=int(year),
-        month=int(month),
-        day=int(day),
-        hour=int(hour),
-        minute=int(minute),
-        second=int(second),
-        timestamp=timestamp_utc.isoformat(),
+        year=year_int,
+        month=month_int,
+        day=day_int,
+        hour=hour_int,
+        minute=minute_int,
+        second=second_int,
+        timestamp=f"{year}-{month}-{day}T{hour}:{minute}:{second}+00:00",
     )
 
 
@@ -193,15 +216,39 @@ class SignalStatistics:
     earthquake_count: int = 0
 
 
+def dataclass_to_dict(obj: typing.Any) -> dict:
+    """
+    フィールドがすべてスカラー値のデータクラスを辞書に変換する.
+
+    dataclasses.asdict() はフィールドごとに再帰的なコピーを行うため、
+    ネストの無いデータクラスではフィールド値をそのまま詰めた辞書で代用する。
+    （ネストしたデータクラスは辞書に変換されないため使えない）
+    """
+    return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+
+
 def _earthquake_to_dict(earthquake: EarthquakeData | dict | None) -> dict | None:
     """EarthquakeData または辞書を辞書に変換する."""
     if earthquake is None:
         return None
     if isinstance(earthquake, EarthquakeData):
-        return dataclasses.asdict(earthquake)
+        return dataclass_to_dict(earthquake)
     return earthquake
 
 
+# row_to_screenshot_dict() が受け取る行タプルの列順に対応する辞書キー
+SCREENSHOT_ROW_KEYS = (
+    "filename",
+    "filepath",
+    "timestamp",
+    "sta",
+    "lta",
+    "sta_lta_ratio",
+    "max_count",
+    "metadata",
+)
+
+
 def row_to_screenshot_dict(row: tuple, earthquake: EarthquakeData | dict | None = None) -> dict:
     """
     SQLite の行データをスクリーンショット辞書に変換する.
@@ -215,16 +262,7 @@ def row_to_screenshot_dict(row: tuple, earthquake: EarthquakeData | dict | None
         スクリーンショット情報の辞書
 
     """
-    result: dict = {
-        "filename": row[0],
-        "filepath": row[1],
-        "timestamp": row[2],
-        "sta": row[3],
-        "lta": row[4],
-        "sta_lta_ratio": row[5],
-        "max_count": row[6],
-        "metadata": row[7],
-    }
+    result: dict = dict(zip(SCREENSHOT_ROW_KEYS, row, strict=True))
     eq_dict = _earthquake_to_dict(earthquake)
     if eq_dict is not None:
         result["earthquake"] = eq_dict
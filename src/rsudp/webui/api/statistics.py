@@ -6,7 +6,6 @@ cache.db（screenshot_metadata）と quake.db（earthquakes）を読み取り専
 存在しない DB / テーブルは空データとして扱い、例外を送出しない。
 """
 
-import collections
 import dataclasses
 import datetime
 import math
@@ -14,7 +13,6 @@ import sqlite3
 from pathlib import Path
 
 import rsudp.config
-import rsudp.types
 
 # max_count ヒストグラムのビン下限境界（対数寄り）。最後は開区間 (10000+)。
 _DISTRIBUTION_BOUNDS: tuple[int, ...] = (0, 100, 200, 500, 1000, 2000, 5000, 10000)
@@ -101,10 +99,10 @@ def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return 2 * earth_radius_km * math.asin(math.sqrt(a))
 
 
-def _to_jst_date(timestamp_str: str) -> str:
-    """UTC の ISO タイムスタンプ文字列を JST の日付文字列 (YYYY-MM-DD) に変換する."""
-    ts = datetime.datetime.fromisoformat(timestamp_str)
-    return ts.astimezone(rsudp.types.JST).date().isoformat()
+# timestamp 列（UTC の ISO 文字列）を JST の日付文字列 (YYYY-MM-DD) に変換する SQL 式。
+# Asia/Tokyo は夏時間がなく UTC+9 固定なので、rsudp.types.to_jst で変換した日付と一致する。
+# 日付ごとの集計を SQL の GROUP BY で行い、行ごとに Python で日時を解析しないために使う
+_JST_DATE_SQL = "date(timestamp, '+9 hours')"
 
 
 def _utc_cutoff_iso(days: int) -> str:
@@ -134,20 +132,22 @@ def get_daily_counts(cache_path: Path, days: int = 90) -> list[DailyCount]:
         return []
 
     cutoff = _utc_cutoff_iso(days)
-    counts: collections.Counter[str] = collections.Counter()
     try:
         with sqlite3.connect(cache_path) as conn:
             cursor = conn.execute(
-                "SELECT timestamp FROM screenshot_metadata WHERE timestamp >= ?",
+                f"""
+                SELECT {_JST_DATE_SQL} AS jst_date, COUNT(*)
+                FROM screenshot_metadata
+                WHERE timestamp >= ?
+                GROUP BY jst_date
+                ORDER BY jst_date
+                """,  # noqa: S608 - 式は定数
                 (cutoff,),
             )
-            for (timestamp_str,) in cursor:
-                counts[_to_jst_date(timestamp_str)] += 1
+            return [DailyCount(date=date, count=count) for date, count in cursor]
     except sqlite3.Error:
         return []
 
-    return [DailyCount(date=date, count=counts[date]) for date in sorted(counts)]
-
 
 def _bin_index(value: float) -> int:
     """max_count 値が属するビンのインデックスを返す."""
@@ -210,37 +210,45 @@ def get_association(cache_path: Path, days: int = 90) -> list[AssociationCount]:
         return []
 
     cutoff = _utc_cutoff_iso(days)
-    total: collections.Counter[str] = collections.Counter()
-    matched: collections.Counter[str] = collections.Counter()
     try:
         with sqlite3.connect(cache_path) as conn:
             cursor = conn.execute(
-                "SELECT timestamp, earthquake_event_id FROM screenshot_metadata WHERE timestamp >= ?",
+                f"""
+                SELECT {_JST_DATE_SQL} AS jst_date, COUNT(*), COUNT(earthquake_event_id)
+                FROM screenshot_metadata
+                WHERE timestamp >= ?
+                GROUP BY jst_date
+                ORDER BY jst_date
+                """,  # noqa: S608 - 式は定数
                 (cutoff,),
             )
-            for timestamp_str, event_id in cursor:
-                date = _to_jst_date(timestamp_str)
-                total[date] += 1
-                if event_id is not None:
-                    matched[date] += 1
+            return [
+                AssociationCount(date=date, total=total, matched=matched) for date, total, matched in cursor
+            ]
     except sqlite3.Error:
         return []
 
-    return [AssociationCount(date=date, total=total[date], matched=matched[date]) for date in sorted(total)]
-
 
 def _max_count_in_window(
     conn: sqlite3.Connection,
-    start_utc_iso: str,
-    end_utc_iso: str,
+    start_epoch: int,
+    end_epoch: int,
 ) -> float | None:
-    """指定 UTC 時間窓内の max_count 最大値を返す（該当なしは None）."""
+    """
+    指定時間窓（UNIX エポック秒）内の max_count 最大値を返す（該当なしは None）.
+
+    生成列 timestamp_epoch はマイグレーション前の cache.db には無いため、
+    timestamp（UTC の ISO 文字列）のインデックスで範囲検索する。
+    """
     cursor = conn.execute(
         """
         SELECT MAX(max_count) FROM screenshot_metadata
         WHERE max_count IS NOT NULL AND timestamp >= ? AND timestamp <= ?
         """,
-        (start_utc_iso, end_utc_iso),
+        (
+            datetime.datetime.fromtimestamp(start_epoch, datetime.UTC).isoformat(),
+            datetime.datetime.fromtimestamp(end_epoch, datetime.UTC).isoformat(),
+        ),
     )
     row = cursor.fetchone()
     if row is None or row[0] is None:
@@ -278,21 +286,30 @@ def get_sensitivity(
         with sqlite3.connect(quake_path) as quake_conn:
             quake_rows = quake_conn.execute(
                 """
-                SELECT event_id, detected_at, latitude, longitude, magnitude, depth, epicenter_name
+                SELECT event_id, detected_at, CAST(strftime('%s', detected_at) AS INTEGER),
+                       latitude, longitude, magnitude, depth, epicenter_name
                 FROM earthquakes
                 """
             ).fetchall()
 
         with sqlite3.connect(cache_path) as cache_conn:
-            for event_id, detected_at, latitude, longitude, magnitude, depth, epicenter_name in quake_rows:
-                start, end = rsudp.types.calculate_earthquake_time_range(
-                    detected_at,
-                    before_seconds=_QUAKE_BEFORE_SECONDS,
-                    after_seconds=_QUAKE_AFTER_SECONDS,
+            # 発生時刻はエポック秒で取得済みなので、時間窓は整数演算で求める
+            # （地震ごとの ISO 文字列のパースを省く）
+            for (
+                event_id,
+                detected_at,
+                detected_epoch,
+                latitude,
+                longitude,
+                magnitude,
+                depth,
+                epicenter_name,
+            ) in quake_rows:
+                max_count = _max_count_in_window(
+                    cache_conn,
+                    detected_epoch - _QUAKE_BEFORE_SECONDS,
+                    detected_epoch + _QUAKE_AFTER_SECONDS,
                 )
-                start_utc = start.astimezone(datetime.UTC).isoformat()
-                end_utc = end.astimezone(datetime.UTC).isoformat()
-                max_count = _max_count_in_window(cache_conn, start_utc, end_utc)
                 if max_count is None:
                     continue
                 distance_km = haversine_km(
@@ -2,9 +2,12 @@
 
 import dataclasses
 import functools
+import hashlib
 import html
+import os
 import sqlite3
 import threading
+import time
 import traceback
 from pathlib import Path
 
@@ -12,6 +15,7 @@ import flask
 import my_lib.flask_util
 from flask_pydantic import validate
 
+import rsudp.cli.cleaner
 import rsudp.config
 import rsudp.quake.crawl
 import rsudp.quake.database
@@ -24,25 +28,34 @@ viewer_api = flask.Blueprint("viewer_api", __name__, url_prefix="/rsudp")
 blueprint = viewer_api  # Alias for compatibility with webui.py
 
 
+# 動的 API レスポンスに付けるキャッシュ無効化ヘッダー
+_NO_CACHE_HEADERS = {
+    "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
+    "Pragma": "no-cache",
+    "Expires": "0",
+}
+
+# no_cache を付けたエンドポイント名（"viewer_api.<関数名>"）
+_no_cache_endpoints: set[str] = set()
+
+
 def no_cache(func):
-    """動的 API レスポンスにキャッシュ無効化ヘッダーを追加するデコレータ."""
-
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        response = func(*args, **kwargs)
-        # jsonify の結果は Response オブジェクトまたはタプル
-        if isinstance(response, tuple):
-            # エラーレスポンス (response, status_code) の場合
-            resp = flask.make_response(response[0])
-            resp.status_code = response[1]
-        else:
-            resp = flask.make_response(response)
-        resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-        resp.headers["Pragma"] = "no-cache"
-        resp.headers["Expires"] = "0"
-        return resp
+    """
+    動的 API レスポンスにキャッシュ無効化ヘッダーを追加するデコレータ.
+
+    ビュー関数をラップせずにエンドポイント名を登録するだけで、ヘッダーは
+    after_request でまとめて付ける（リクエストごとの make_response を避ける）。
+    """
+    _no_cache_endpoints.add(f"{viewer_api.name}.{func.__name__}")
+    return func
 
-    return wrapper
+
+@viewer_api.after_request
+def _add_no_cache_headers(response: flask.Response) -> flask.Response:
+    """no_cache を付けたエンドポイントのレスポンスにキャッシュ無効化ヘッダーを付ける."""
+    if flask.request.endpoint in _no_cache_endpoints:
+        response.headers.update(_NO_CACHE_HEADERS)
+    return response
 
 
 # Global instance of ScreenshotManager
@@ -50,7 +63,30 @@ _screenshot_manager: rsudp.screenshot_manager.ScreenshotManager | None = None
 
 # Lock for scan operation to prevent concurrent scans
 _scan_lock = threading.Lock()
-_is_scanning = False
+
+# 画像ファイルパスの解決結果（(screenshots ディレクトリ, ファイル名) → パス）
+_IMAGE_PATH_CACHE_SIZE = 4096
+_image_path_cache: dict[tuple[Path, str], str] = {}
+_image_path_cache_lock = threading.Lock()
+
+# quake.db の地震件数（((パス, 更新時刻, サイズ), 件数)）
+_earthquake_count_cache: tuple[tuple[Path, int, int], int] | None = None
+
+# 直近の地震一覧（(quake.db の版, 地震の辞書のリスト)）
+_earthquake_list_cache: tuple[tuple[Path, int, int], list[dict]] | None = None
+
+# OGP 画像のキャッシュディレクトリ名（cache.db と同じディレクトリに作る）
+_OGP_CACHE_DIR_NAME = "ogp"
+
+# OGP 画像のキャッシュに残すファイル数の上限（超えた分は最終利用が古いものから消す）
+_OGP_CACHE_MAX_FILES = 256
+
+# OGP 画像のキャッシュを利用したときに最終利用時刻（更新時刻）を更新する間隔（秒）。
+# SD カードへの書き込みを抑えるため、リクエストごとには更新しない
+_OGP_CACHE_TOUCH_INTERVAL_SEC = 3600
+
+# </head> で分割した index.html（パス → ((更新時刻, サイズ), (前半, 後半))）
+_index_html_cache: dict[Path, tuple[tuple[int, int], tuple[str, str | None]]] = {}
 
 
 def _get_config() -> rsudp.config.Config:
@@ -82,20 +118,6 @@ def _get_quake_db_path() -> Path:
     return _get_config().data.quake
 
 
-def _format_screenshot_with_earthquake(s: dict, quake_db_path: Path | None = None) -> dict:
-    """Format screenshot dict with optional earthquake info."""
-    manager = _get_screenshot_manager()
-
-    # 地震情報を取得（辞書に含まれていない場合）
-    earthquake = None
-    if "earthquake" in s and s["earthquake"] is not None:
-        earthquake = s["earthquake"]
-    elif quake_db_path:
-        earthquake = manager.get_earthquake_for_screenshot(s["timestamp"], quake_db_path)
-
-    return rsudp.types.screenshot_dict_to_response(s, earthquake)
-
-
 @viewer_api.route("/api/screenshot/", methods=["GET"])
 @my_lib.flask_util.gzipped
 @no_cache
@@ -138,13 +160,17 @@ def list_screenshots(query: schemas.ScreenshotListQuery):
                     )
                 except sqlite3.Error:
                     screenshots = []
-            # すでに earthquake キーが含まれているのでそのまま使用
-            formatted_screenshots = [_format_screenshot_with_earthquake(s, None) for s in screenshots]
+            # 地震情報は SQL の結合で earthquake キーに付加済み
+            formatted_screenshots = list(map(rsudp.types.screenshot_dict_to_response, screenshots))
         else:
             # Get screenshots with optional maximum signal filter
             # 地震情報の付加は行わない（パフォーマンス向上のため）
-            screenshots = manager.get_screenshots_with_signal_filter(min_max_signal)
-            formatted_screenshots = [_format_screenshot_with_earthquake(s, None) for s in screenshots]
+            formatted_screenshots = list(
+                map(
+                    rsudp.types.screenshot_dict_to_response,
+                    manager.iter_screenshots_with_signal_filter(min_max_signal),
+                )
+            )
 
         return flask.jsonify(
             {
@@ -158,6 +184,39 @@ def list_screenshots(query: schemas.ScreenshotListQuery):
         return flask.jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
 
 
+@viewer_api.route("/api/screenshot/stream/", methods=["GET"])
+@no_cache
+@validate()
+def stream_screenshots(query: schemas.MinMaxSignalQuery):
+    """
+    List screenshots as NDJSON (one screenshot per line), streamed.
+
+    一覧全体を JSON 配列として組み立てずにカーソルから 1 行ずつ送るため、
+    件数が多くてもメモリに全件を保持せず、クライアントは届いた行から描画できる。
+    Query parameters:
+    - min_max_signal: Minimum maximum signal value to filter screenshots
+    """
+    manager = _get_screenshot_manager()
+    dumps = flask.current_app.json.dumps
+
+    def generate():
+        for s in manager.iter_screenshots_with_signal_filter(query.min_max_signal):
+            yield dumps(rsudp.types.screenshot_dict_to_response(s)) + "\n"
+
+    return flask.Response(flask.stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@functools.lru_cache(maxsize=4)
+def _resolve_base_directory(base_dir: Path) -> Path:
+    """
+    基準ディレクトリの実パスを返す.
+
+    基準ディレクトリは設定で固定なので、resolve()（パス要素ごとの lstat）は
+    リクエストごとではなく最初の 1 回だけ行う。
+    """
+    return base_dir.resolve()
+
+
 def _is_within_directory(base_dir: Path, candidate: Path) -> bool:
     """
     candidate が base_dir 配下（または base_dir 自身）に収まるか検証する.
@@ -165,7 +224,7 @@ def _is_within_directory(base_dir: Path, candidate: Path) -> bool:
     パストラバーサル（例: ../../etc/passwd）で screenshots ディレクトリ外の
     ファイルが配信されるのを防ぐため、resolve() 後の実パスで包含関係を確認する。
     """
-    base = base_dir.resolve()
+    base = _resolve_base_directory(base_dir)
     try:
         resolved = candidate.resolve()
     except OSError:
@@ -175,7 +234,29 @@ def _is_within_directory(base_dir: Path, candidate: Path) -> bool:
 
 def _get_image_file_path(filename: str):
     """
-    Get the actual file path for a given filename.
+    Get the actual file path for a given filename (cached).
+
+    画像配信では file_etag と本体で同じファイル名を 2 回解決するため、
+    解決済みのパスを保持しておき、ファイルが残っている間は再利用する。
+    ファイルが移動・削除されていれば探し直す。
+    """
+    key = (_get_screenshots_path(), filename)
+    cached = _image_path_cache.get(key)
+    if cached is not None and Path(cached).is_file():
+        return cached
+
+    file_path = _find_image_file_path(filename)
+    if file_path is not None:
+        with _image_path_cache_lock:
+            if len(_image_path_cache) >= _IMAGE_PATH_CACHE_SIZE:
+                del _image_path_cache[next(iter(_image_path_cache))]
+            _image_path_cache[key] = file_path
+    return file_path
+
+
+def _find_image_file_path(filename: str):
+    """
+    Find the actual file path for a given filename.
 
     ファイル名から日付ベースのサブディレクトリパスを直接構築することで、
     全ディレクトリを再帰走査する rglob を回避する。
@@ -210,9 +291,19 @@ def _get_image_file_path(filename: str):
             if candidate.is_file() and _is_within_directory(screenshots_dir, candidate):
                 return str(candidate)
 
-    # 解析できない/見つからない場合のみ、最終フォールバックとして再帰走査
-    for found_path in screenshots_dir.rglob(filename):
-        if found_path.is_file() and _is_within_directory(screenshots_dir, found_path):
+    # 解析できない/見つからない場合のみ、最終フォールバックとして再帰走査。
+    # os.walk（内部で os.scandir）でディレクトリごとのファイル名一覧と完全一致で照合する
+    # （rglob と違い、ファイル単位の Path 生成や stat が不要で、* 等もパターン扱いしない）
+    target = Path(filename)
+    for dirpath, _dirnames, filenames in os.walk(screenshots_dir):
+        if target.name not in filenames:
+            continue
+        found_path = Path(dirpath) / target.name
+        if (
+            found_path.parts[-len(target.parts) :] == target.parts
+            and found_path.is_file()
+            and _is_within_directory(screenshots_dir, found_path)
+        ):
             return str(found_path)
 
     return None
@@ -255,28 +346,31 @@ def get_image(filename: str):
         return flask.jsonify({"error": str(e)}), 500
 
 
-@viewer_api.route("/api/screenshot/ogp/<path:filename>", methods=["GET"])
-def get_ogp_image(filename: str):
+def _get_ogp_cache_path(file_path: Path, stat: os.stat_result) -> Path:
     """
-    OGP用に最適化された画像を返す.
+    OGP 画像のキャッシュファイルパスを返す.
 
-    画像の上部を切り出し、Twitter Cards推奨の1.91:1アスペクト比にクロップする。
+    OGP 画像は元画像だけで決まるため、元画像のパス・更新時刻・サイズをキーにする。
+    元画像が更新されればキーが変わり、作り直される。
     """
-    import io
+    key = f"{file_path}:{stat.st_mtime_ns}:{stat.st_size}"
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return _get_config().data.cache.parent / _OGP_CACHE_DIR_NAME / f"{digest}.png"
 
-    import PIL.Image
 
-    try:
-        file_path_str = _get_image_file_path(filename)
-
-        if not file_path_str:
-            return flask.jsonify({"error": "File not found"}), 404
+def _generate_ogp_image(file_path: Path, ogp_path: Path) -> None:
+    """
+    OGP用に最適化された画像を生成して ogp_path に保存する.
 
-        file_path = Path(file_path_str)
+    画像の上部を切り出し、Twitter Cards推奨の1.91:1アスペクト比にクロップする。
+    書き込み途中のファイルを配信しないよう、一時ファイルに書いてから置き換える。
+    """
+    import PIL.Image
 
-        if file_path.stat().st_size == 0:
-            return flask.jsonify({"error": "File is empty"}), 404
+    ogp_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = ogp_path.with_name(f"{ogp_path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
 
+    try:
         # 画像を開く
         with PIL.Image.open(file_path) as img:
             width, height = img.size
@@ -288,22 +382,81 @@ def get_ogp_image(filename: str):
             # 画像の上部から切り出し（波形の冒頭を表示）
             cropped = img.crop((0, 0, width, target_height)) if target_height < height else img
 
-            # PNGとして出力
-            output = io.BytesIO()
-            cropped.save(output, format="PNG", optimize=True)
-            output.seek(0)
+            # PNGとして出力（optimize=True は圧縮の総当たりで 2 倍以上遅いため使わない）
+            cropped.save(tmp_path, format="PNG", compress_level=6)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
-            response = flask.send_file(
-                output,
-                mimetype="image/png",
-                as_attachment=False,
-                download_name=None,
-            )
+    tmp_path.replace(ogp_path)
+
+
+def _evict_ogp_cache(cache_dir: Path) -> None:
+    """
+    OGP 画像のキャッシュを上限のファイル数まで減らす.
+
+    元画像の削除や更新で参照されなくなったファイルも残り続けるため、
+    更新時刻（最終利用時刻）が古いものから削除する。
+    """
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(".png"):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry.path))
+            except FileNotFoundError:
+                continue
+
+    if len(entries) <= _OGP_CACHE_MAX_FILES:
+        return
+
+    entries.sort()
+    for _, path in entries[: len(entries) - _OGP_CACHE_MAX_FILES]:
+        Path(path).unlink(missing_ok=True)
+
+
+@viewer_api.route("/api/screenshot/ogp/<path:filename>", methods=["GET"])
+def get_ogp_image(filename: str):
+    """
+    OGP用に最適化された画像を返す.
+
+    生成した画像はディスクにキャッシュし、2 回目以降はそのファイルを配信する。
+    キャッシュは _OGP_CACHE_MAX_FILES 個までとし、最終利用が古いものから削除する。
+    """
+    try:
+        file_path_str = _get_image_file_path(filename)
+
+        if not file_path_str:
+            return flask.jsonify({"error": "File not found"}), 404
+
+        file_path = Path(file_path_str)
+        stat = file_path.stat()
+
+        if stat.st_size == 0:
+            return flask.jsonify({"error": "File is empty"}), 404
 
-            # キャッシュヘッダーを設定
-            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        ogp_path = _get_ogp_cache_path(file_path, stat)
+        try:
+            ogp_mtime = ogp_path.stat().st_mtime
+        except FileNotFoundError:
+            _generate_ogp_image(file_path, ogp_path)
+            _evict_ogp_cache(ogp_path.parent)
+        else:
+            if time.time() - ogp_mtime > _OGP_CACHE_TOUCH_INTERVAL_SEC:
+                os.utime(ogp_path)
+
+        response = flask.send_file(
+            ogp_path,
+            mimetype="image/png",
+            as_attachment=False,
+            download_name=None,
+        )
 
-            return response
+        # キャッシュヘッダーを設定
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+
+        return response
 
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
@@ -323,13 +476,12 @@ def get_latest(query: schemas.MinMaxSignalQuery):
         manager = _get_screenshot_manager()
         min_max_signal = query.min_max_signal
 
-        # Get screenshots with optional maximum signal filter
-        screenshots = manager.get_screenshots_with_signal_filter(min_max_signal)
+        # タイムスタンプ降順の先頭 1 件だけを SQL で取得する（全件を読み込まない）
+        screenshots = manager.get_screenshots_in_range(None, None, min_max_signal, limit=1)
 
         if not screenshots:
             return flask.jsonify({"error": "No screenshots found"}), 404
 
-        # First one is already the latest (sorted by timestamp desc)
         latest = screenshots[0]
 
         return flask.jsonify(rsudp.types.screenshot_dict_to_response(latest))
@@ -338,6 +490,44 @@ def get_latest(query: schemas.MinMaxSignalQuery):
         return flask.jsonify({"error": str(e)}), 500
 
 
+def _quake_db_version() -> tuple[Path, int, int] | None:
+    """
+    quake.db の版（パス・更新時刻・サイズ）を返す.
+
+    quake.db はクロール時にしか更新されないため、これが変わるまでは
+    quake.db から読んだ結果を使い回せる。quake.db が無い場合は None を返す。
+    """
+    quake_db_path = _get_quake_db_path()
+    try:
+        stat = quake_db_path.stat()
+    except FileNotFoundError:
+        return None
+    return (quake_db_path, stat.st_mtime_ns, stat.st_size)
+
+
+def _get_earthquake_count() -> int:
+    """
+    quake.db に保存されている地震の件数を返す.
+
+    統計 API はポーリングされ、QuakeDatabase の生成はスキーマ初期化を伴うため、
+    quake.db の更新時刻とサイズが変わるまでは前回の件数を使う。
+    quake.db が無い場合は 0 を返す。
+    """
+    global _earthquake_count_cache
+
+    version = _quake_db_version()
+    if version is None:
+        return 0
+
+    cached = _earthquake_count_cache
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    count = rsudp.quake.database.QuakeDatabase(_get_config()).count_earthquakes()
+    _earthquake_count_cache = (version, count)
+    return count
+
+
 @viewer_api.route("/api/screenshot/statistics/", methods=["GET"])
 @no_cache
 @validate()
@@ -363,20 +553,12 @@ def get_statistics(query: schemas.EarthquakeOnlyQuery):
         )
 
         # Add absolute total (without earthquake filter)
-        if earthquake_only:
-            all_stats = manager.get_signal_statistics(earthquake_only=False)
-            stats.absolute_total = all_stats.total
-        else:
-            stats.absolute_total = stats.total
+        stats.absolute_total = manager.count_screenshots() if earthquake_only else stats.total
 
         # Add earthquake count
-        if _get_quake_db_path().exists():
-            quake_db = rsudp.quake.database.QuakeDatabase(_get_config())
-            stats.earthquake_count = quake_db.count_earthquakes()
-        else:
-            stats.earthquake_count = 0
+        stats.earthquake_count = _get_earthquake_count()
 
-        return flask.jsonify(dataclasses.asdict(stats))
+        return flask.jsonify(rsudp.types.dataclass_to_dict(stats))
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -396,7 +578,7 @@ def statistics_daily(query: schemas.DaysQuery):
     try:
         cache_path = _get_config().data.cache
         data = statistics.get_daily_counts(cache_path, query.days)
-        return flask.jsonify({"data": [dataclasses.asdict(d) for d in data]})
+        return flask.jsonify({"data": [rsudp.types.dataclass_to_dict(d) for d in data]})
     except (sqlite3.Error, OSError) as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -410,7 +592,7 @@ def statistics_distribution():
     try:
         cache_path = _get_config().data.cache
         bins = statistics.get_distribution(cache_path)
-        return flask.jsonify({"bins": [dataclasses.asdict(b) for b in bins]})
+        return flask.jsonify({"bins": [rsudp.types.dataclass_to_dict(b) for b in bins]})
     except (sqlite3.Error, OSError) as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -430,7 +612,7 @@ def statistics_association(query: schemas.DaysQuery):
     try:
         cache_path = _get_config().data.cache
         data = statistics.get_association(cache_path, query.days)
-        return flask.jsonify({"data": [dataclasses.asdict(d) for d in data]})
+        return flask.jsonify({"data": [rsudp.types.dataclass_to_dict(d) for d in data]})
     except (sqlite3.Error, OSError) as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -466,8 +648,6 @@ def scan_screenshots():
     - full: If true, perform a full scan. Otherwise, perform an incremental scan.
             Default is false (incremental scan).
     """
-    global _is_scanning
-
     # full パラメータを取得（クエリパラメータまたは JSON ボディから）
     full_scan = False
     if flask.request.is_json:
@@ -481,10 +661,6 @@ def scan_screenshots():
         return flask.jsonify({"success": True, "message": "Scan already in progress", "skipped": True})
 
     try:
-        if _is_scanning:
-            return flask.jsonify({"success": True, "message": "Scan already in progress", "skipped": True})
-
-        _is_scanning = True
         manager = _get_screenshot_manager()
 
         # Organize files and scan for new ones
@@ -503,7 +679,6 @@ def scan_screenshots():
     except Exception as e:
         return flask.jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
     finally:
-        _is_scanning = False
         _scan_lock.release()
 
 
@@ -519,6 +694,27 @@ def crawl_earthquake_data():
         return flask.jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
 
 
+def _get_recent_earthquakes() -> list[dict]:
+    """
+    直近 100 件の地震を辞書のリストで返す.
+
+    quake.db の版が変わるまでは前回の結果を使い回す（地震一覧はクロール時にしか変わらない）。
+    """
+    global _earthquake_list_cache
+
+    version = _quake_db_version()
+    cached = _earthquake_list_cache
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1]
+
+    # quake.db が無い場合は QuakeDatabase が作成する
+    quake_db = rsudp.quake.database.QuakeDatabase(_get_config())
+    earthquakes = [rsudp.types.dataclass_to_dict(eq) for eq in quake_db.get_all_earthquakes(limit=100)]
+    if version is not None:
+        _earthquake_list_cache = (version, earthquakes)
+    return earthquakes
+
+
 @viewer_api.route("/api/earthquake/list/", methods=["GET"])
 @my_lib.flask_util.gzipped
 @no_cache
@@ -527,10 +723,7 @@ def list_earthquakes():
     # gzipped デコレータによる no-store の上書きを防ぐ
     flask.g.disable_cache = True
     try:
-        config = _get_config()
-        quake_db = rsudp.quake.database.QuakeDatabase(config)
-        earthquakes = quake_db.get_all_earthquakes(limit=100)
-        earthquakes_dict = [dataclasses.asdict(eq) for eq in earthquakes]
+        earthquakes_dict = _get_recent_earthquakes()
         return flask.jsonify({"earthquakes": earthquakes_dict, "total": len(earthquakes_dict)})
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
@@ -550,8 +743,6 @@ def clean_screenshots(body: schemas.CleanRequest):
     - dry_run: True の場合、実際には削除しない (default: False)
     """
     try:
-        import rsudp.cli.cleaner
-
         config = _get_config()
 
         # Get parameters from validated body
@@ -615,8 +806,7 @@ def _get_ogp_content_for_screenshot(
         return ("", "", "", "")
 
     # スクリーンショットのメタデータを取得
-    screenshots = manager.get_screenshots_with_signal_filter(None)
-    screenshot = next((s for s in screenshots if s["filename"] == filename), None)
+    screenshot = manager.get_screenshot_by_filename(filename)
     if not screenshot:
         return ("", "", "", "")
 
@@ -704,6 +894,30 @@ def _generate_ogp_meta_tags(filename: str | None, base_url: str) -> str:
     return _build_ogp_meta_tags(title, description, image_url, page_url)
 
 
+def _load_index_html_parts(index_path: Path) -> tuple[str, str | None] | None:
+    """
+    index.html を </head> の前後に分割して返す.
+
+    index.html はデプロイ時にしか変わらないため、更新時刻とサイズが同じ間は
+    読み込み・分割済みの内容を再利用する。</head> が無い場合は後半を None とする。
+    ファイルが存在しない場合は None を返す。
+    """
+    try:
+        stat = index_path.stat()
+    except FileNotFoundError:
+        return None
+
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _index_html_cache.get(index_path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    head, sep, rest = index_path.read_text(encoding="utf-8").partition("</head>")
+    parts = (head, rest if sep else None)
+    _index_html_cache[index_path] = (version, parts)
+    return parts
+
+
 @viewer_api.route("/", methods=["GET"])
 @validate()
 def index_with_ogp(query: schemas.IndexQuery) -> flask.Response:
@@ -716,13 +930,10 @@ def index_with_ogp(query: schemas.IndexQuery) -> flask.Response:
     try:
         # 静的ファイルディレクトリから index.html を読み込む
         index_path = _get_config().webapp.static_dir_path / "index.html"
-        if not index_path.exists():
+        index_parts = _load_index_html_parts(index_path)
+        if index_parts is None:
             return flask.Response("index.html not found", status=404)
 
-        # index.htmlを読み込む
-        with index_path.open(encoding="utf-8") as f:
-            html_content = f.read()
-
         # ベースURLを構築
         # X-Forwarded-Proto と X-Forwarded-Host を考慮
         scheme = flask.request.headers.get("X-Forwarded-Proto", flask.request.scheme)
@@ -736,7 +947,8 @@ def index_with_ogp(query: schemas.IndexQuery) -> flask.Response:
         ogp_tags = _generate_ogp_meta_tags(filename, base_url)
 
         # </head>の前にOGPタグを挿入
-        html_content = html_content.replace("</head>", f"{ogp_tags}\n    </head>")
+        head, rest = index_parts
+        html_content = head if rest is None else f"{head}{ogp_tags}\n    </head>{rest}"
 
         return flask.Response(html_content, mimetype="text/html")
 
@@ -6,7 +6,9 @@ ScreenshotManager のユニットテスト.
 """
 
 import sqlite3
-from datetime import datetime
+from datetime import UTC, datetime
+
+import pytest
 
 import rsudp.types
 from rsudp.screenshot_manager import ScreenshotManager
@@ -147,6 +149,53 @@ class TestGetScreenshotsWithEarthquakeFilter:
         assert len(result) == 0
 
 
+class TestOverlappingEarthquakeWindows:
+    """時間窓が重なる場合の最近傍地震選択のテスト."""
+
+    def test_overlapping_windows_pick_closest(self, screenshot_config):
+        """余震で時間窓が重なっても 3 経路で発生時刻が最も近い地震が選ばれることを確認."""
+        from rsudp.quake.database import QuakeDatabase
+
+        quake_db_path = screenshot_config.data.quake
+        quake_db = QuakeDatabase(screenshot_config)
+        insert_test_earthquake(
+            quake_db,
+            event_id="main",
+            detected_at=datetime(2025, 12, 13, 4, 5, 0, tzinfo=rsudp.types.JST),
+        )
+        insert_test_earthquake(
+            quake_db,
+            event_id="aftershock",
+            detected_at=datetime(2025, 12, 13, 4, 7, 0, tzinfo=rsudp.types.JST),
+        )
+
+        manager = ScreenshotManager(screenshot_config)
+
+        expected = {
+            "2025-12-12T19:05:30+00:00": "main",
+            "2025-12-12T19:06:50+00:00": "aftershock",
+            # 後の地震の 30 秒前より前でも、前の地震の時間窓内ならそちらを選ぶ
+            "2025-12-12T19:04:40+00:00": "main",
+        }
+        with sqlite3.connect(manager.cache_path) as conn:
+            for index, timestamp in enumerate(expected):
+                insert_screenshot_metadata(conn, filename=f"SHAKE-{index}.png", timestamp=timestamp)
+
+        for timestamp, event_id in expected.items():
+            result = manager.get_earthquake_for_screenshot(timestamp, quake_db_path)
+            assert result is not None
+            assert result.event_id == event_id
+        assert manager.get_earthquake_for_screenshot("2025-12-12T19:20:00+00:00", quake_db_path) is None
+
+        filtered = manager.get_screenshots_with_earthquake_filter(quake_db_path=quake_db_path)
+        assert {ss["timestamp"]: ss["earthquake"]["event_id"] for ss in filtered} == expected
+
+        assert manager.update_earthquake_associations(quake_db_path) == 3
+        with sqlite3.connect(manager.cache_path) as conn:
+            associated = dict(conn.execute("SELECT timestamp, earthquake_event_id FROM screenshot_metadata"))
+        assert associated == expected
+
+
 class TestGetSignalStatistics:
     """統計情報取得のテスト."""
 
@@ -182,6 +231,148 @@ class TestGetSignalStatistics:
 
         assert result.total == 1
 
+    def test_get_signal_statistics_memo_invalidated_on_write(self, screenshot_config):
+        """メモ化された統計情報が別接続からの書き込みで更新されることを確認."""
+        manager = ScreenshotManager(screenshot_config)
+
+        first = manager.get_signal_statistics()
+        assert first.total == 0
+
+        # 呼び出し元による書き換えがメモに影響しないこと
+        first.absolute_total = 100
+        assert manager.get_signal_statistics().absolute_total == 0
+
+        with sqlite3.connect(manager.cache_path) as conn:
+            insert_screenshot_metadata(conn)
+
+        assert manager.get_signal_statistics().total == 1
+
+    def test_get_signal_statistics_memo_shared_across_threads(self, screenshot_config):
+        """別スレッドからの呼び出しでもメモ化された統計情報を返すことを確認."""
+        import threading
+        import unittest.mock
+
+        manager = ScreenshotManager(screenshot_config)
+        with sqlite3.connect(manager.cache_path) as conn:
+            insert_screenshot_metadata(conn)
+
+        results = []
+        with unittest.mock.patch.object(
+            rsudp.types, "SignalStatistics", wraps=rsudp.types.SignalStatistics
+        ) as signal_statistics:
+            for _ in range(2):
+                thread = threading.Thread(target=lambda: results.append(manager.get_signal_statistics()))
+                thread.start()
+                thread.join()
+
+        assert [result.total for result in results] == [1, 1]
+        # 集計は 1 回目のみ（2 回目はメモのコピーを返す）
+        assert signal_statistics.call_count == 1
+
+
+class TestGetScreenshotsInRange:
+    """get_screenshots_in_range のテスト."""
+
+    def test_get_screenshots_in_range(self, screenshot_config):
+        """期間・最小信号値・ページ指定で絞り込めることを確認."""
+        manager = ScreenshotManager(screenshot_config)
+
+        with sqlite3.connect(manager.cache_path) as conn:
+            for hour, max_count in ((1, 500.0), (2, 2000.0), (3, 3000.0), (4, 4000.0)):
+                insert_screenshot_metadata(
+                    conn,
+                    f"SHAKE-2025-12-12-{hour:02d}0000.png",
+                    timestamp=f"2025-12-12T{hour:02d}:00:00+00:00",
+                    max_count=max_count,
+                )
+
+        start = datetime(2025, 12, 12, 1, 0, 0, tzinfo=UTC)
+        end = datetime(2025, 12, 12, 4, 0, 0, tzinfo=UTC)
+
+        # 終了時刻は含まない・タイムスタンプ降順
+        result = manager.get_screenshots_in_range(start, end)
+        assert [s["filename"] for s in result] == [
+            "SHAKE-2025-12-12-030000.png",
+            "SHAKE-2025-12-12-020000.png",
+            "SHAKE-2025-12-12-010000.png",
+        ]
+
+        result = manager.get_screenshots_in_range(start, end, min_max_signal=1000.0, limit=1, offset=1)
+        assert [s["filename"] for s in result] == ["SHAKE-2025-12-12-020000.png"]
+
+
+class TestGetScreenshotByFilename:
+    """get_screenshot_by_filename のテスト."""
+
+    def test_get_screenshot_by_filename(self, screenshot_config):
+        """ファイル名で 1 件取得でき、無い場合は None を返すことを確認."""
+        manager = ScreenshotManager(screenshot_config)
+
+        with sqlite3.connect(manager.cache_path) as conn:
+            insert_screenshot_metadata(
+                conn,
+                "SHAKE-2025-12-12-010000.png",
+                timestamp="2025-12-12T01:00:00+00:00",
+                max_count=1500.0,
+            )
+
+        result = manager.get_screenshot_by_filename("SHAKE-2025-12-12-010000.png")
+        assert result is not None
+        assert result["filename"] == "SHAKE-2025-12-12-010000.png"
+        assert result["max_count"] == 1500.0
+
+        assert manager.get_screenshot_by_filename("SHAKE-2025-12-12-020000.png") is None
+
+
+class TestCountScreenshots:
+    """count_screenshots のテスト."""
+
+    def test_count_screenshots(self, screenshot_config):
+        """全件数を返し、統計の total と一致することを確認."""
+        manager = ScreenshotManager(screenshot_config)
+        assert manager.count_screenshots() == 0
+
+        with sqlite3.connect(manager.cache_path) as conn:
+            insert_screenshot_metadata(conn, "SHAKE-2025-12-12-010000.png", max_count=1500.0)
+            insert_screenshot_metadata(conn, "SHAKE-2025-12-12-020000.png", max_count=500.0)
+
+        assert manager.count_screenshots() == 2
+        assert manager.count_screenshots() == manager.get_signal_statistics().total
+
+
+class TestConnectionPool:
+    """キャッシュ DB 接続プールのテスト."""
+
+    def test_connection_reused_across_threads(self, screenshot_config):
+        """別スレッドから返却された接続を再利用することを確認."""
+        import threading
+
+        manager = ScreenshotManager(screenshot_config)
+        thread = threading.Thread(target=manager.count_screenshots)
+        thread.start()
+        thread.join()
+
+        assert len(manager._pool) == 1
+        pooled = manager._pool[0]
+
+        assert manager.count_screenshots() == 0
+        assert manager._pool == [pooled]
+
+    def test_close(self, screenshot_config):
+        """close でプール内の接続を閉じ、以降は接続を保持しないことを確認."""
+        manager = ScreenshotManager(screenshot_config)
+        manager.count_screenshots()
+        pooled = manager._pool[0]
+
+        manager.close()
+
+        assert manager._pool == []
+        with pytest.raises(sqlite3.ProgrammingError):
+            pooled.execute("SELECT 1")
+
+        assert manager.count_screenshots() == 0
+        assert manager._pool == []
+
 
 class TestOrganizeFiles:
     """organize_files のテスト."""
@@ -261,6 +452,45 @@ class TestExtractMetadata:
         assert "sta" not in metadata
         assert "raw" not in metadata
 
+    def test_extract_metadata_compressed_text_chunks(self, screenshot_config, temp_dir):
+        """zTXt / iTXt（圧縮あり）の Description からもメタデータを抽出"""
+        from PIL import Image, PngImagePlugin
+
+        manager = ScreenshotManager(screenshot_config)
+
+        description = "STA=100.5, LTA=50.2, STA/LTA=2.001, MaxCount=12345.0"
+        for name, add_chunk in (
+            ("ztxt.png", lambda info: info.add_text("Description", description, zip=True)),
+            ("itxt.png", lambda info: info.add_itxt("Description", description, zip=True)),
+        ):
+            test_file = temp_dir / name
+            pnginfo = PngImagePlugin.PngInfo()
+            add_chunk(pnginfo)
+            Image.new("RGB", (100, 100), color="red").save(test_file, pnginfo=pnginfo)
+
+            metadata = manager._extract_metadata(test_file)
+
+            assert metadata["raw"] == description
+            assert metadata["max_count"] == 12345.0
+
+    def test_extract_metadata_text_chunk_beyond_prefix(self, screenshot_config, temp_dir):
+        """先頭の一括読み込み範囲を超えた位置の Description も抽出"""
+        from PIL import Image, PngImagePlugin
+
+        manager = ScreenshotManager(screenshot_config)
+
+        description = "STA=100.5, LTA=50.2, STA/LTA=2.001, MaxCount=12345.0"
+        pnginfo = PngImagePlugin.PngInfo()
+        pnginfo.add_text("Software", "x" * 20000)
+        pnginfo.add_text("Description", description)
+        test_file = temp_dir / "large_text.png"
+        Image.new("RGB", (100, 100), color="red").save(test_file, pnginfo=pnginfo)
+
+        metadata = manager._extract_metadata(test_file)
+
+        assert metadata["raw"] == description
+        assert metadata["max_count"] == 12345.0
+
 
 class TestScanAndCacheAll:
     """scan_and_cache_all のテスト."""
@@ -331,6 +561,56 @@ class TestScanAndCacheAll:
 
         assert count == 1
 
+    def test_scan_and_cache_all_recaches_on_mtime_change(self, screenshot_config):
+        """サイズが同じでも更新時刻が変わったファイルは再キャッシュされる"""
+        import os
+
+        from PIL import Image
+
+        manager = ScreenshotManager(screenshot_config)
+
+        screenshot_dir = screenshot_config.plot.screenshot.path
+        date_dir = screenshot_dir / "2025" / "12" / "12"
+        date_dir.mkdir(parents=True, exist_ok=True)
+        test_file = date_dir / "SHAKE-2025-12-12-190500.png"
+
+        img = Image.new("RGB", (100, 100), color="red")
+        img.save(test_file)
+
+        assert manager.scan_and_cache_all() == 1
+        assert manager.scan_and_cache_all() == 0
+
+        stat = test_file.stat()
+        os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert manager.scan_and_cache_all() == 1
+
+    def test_scan_and_cache_all_keeps_earthquake_association(self, screenshot_config):
+        """再キャッシュしても地震との関連付けが保持される"""
+        import os
+
+        from PIL import Image
+
+        manager = ScreenshotManager(screenshot_config)
+
+        screenshot_dir = screenshot_config.plot.screenshot.path
+        date_dir = screenshot_dir / "2025" / "12" / "12"
+        date_dir.mkdir(parents=True, exist_ok=True)
+        test_file = date_dir / "SHAKE-2025-12-12-190500.png"
+        Image.new("RGB", (100, 100), color="red").save(test_file)
+
+        assert manager.scan_and_cache_all() == 1
+        with sqlite3.connect(manager.cache_path) as conn:
+            conn.execute("UPDATE screenshot_metadata SET earthquake_event_id = 'test-quake-001'")
+
+        stat = test_file.stat()
+        os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert manager.scan_and_cache_all() == 1
+        with sqlite3.connect(manager.cache_path) as conn:
+            row = conn.execute("SELECT earthquake_event_id, file_mtime FROM screenshot_metadata").fetchone()
+        assert row == ("test-quake-001", test_file.stat().st_mtime)
+
 
 class TestUpdateEarthquakeAssociations:
     """update_earthquake_associations のテスト."""
@@ -464,6 +744,10 @@ class TestDateColumnMigration:
             row = conn.execute("SELECT filename, timestamp, max_count FROM screenshot_metadata").fetchone()
             assert row == ("SHAKE-2025-12-12-190500.png", "2025-12-12T19:05:00+00:00", 1000.0)
 
+            # 既存行にも timestamp_epoch 生成列が付与される
+            epoch = conn.execute("SELECT timestamp_epoch FROM screenshot_metadata").fetchone()[0]
+            assert epoch == int(datetime.fromisoformat("2025-12-12T19:05:00+00:00").timestamp())
+
     def test_migrate_idempotent(self, screenshot_config):
         """新スキーマの DB では 2 回目以降の初期化でも何も起きない"""
         manager = ScreenshotManager(screenshot_config)
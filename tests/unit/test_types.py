@@ -5,6 +5,7 @@ types モジュールのユニットテスト.
 型定義と parse_filename 関数をテストします。
 """
 
+import dataclasses
 from datetime import UTC, datetime
 
 import rsudp.types
@@ -107,3 +108,41 @@ class TestJSTConstant:
 
         # UTC 0:00 は JST 9:00
         assert jst_time.hour == 9
+
+
+class TestDataclassToDict:
+    """dataclass_to_dict のテスト."""
+
+    def test_matches_asdict(self):
+        """dataclasses.asdict と同じ辞書を返し、元のインスタンスと独立していることを確認."""
+        earthquake = rsudp.types.EarthquakeData(
+            id=1,
+            event_id="test-quake-001",
+            detected_at="2025-12-12T19:05:00+00:00",
+            latitude=35.0,
+            longitude=139.0,
+            magnitude=4.5,
+            depth=10,
+            epicenter_name="東京都",
+            max_intensity="3",
+        )
+
+        result = rsudp.types.dataclass_to_dict(earthquake)
+        assert result == dataclasses.asdict(earthquake)
+
+        result["magnitude"] = 0.0
+        assert earthquake.magnitude == 4.5
+
+    def test_slots_dataclass(self):
+        """__slots__ を使うデータクラスも変換できることを確認."""
+        parsed = rsudp.types.parse_filename("SHAKE-2025-12-12-190500.png")
+        assert parsed is not None
+
+        assert rsudp.types.dataclass_to_dict(parsed) == dataclasses.asdict(parsed)
+
+    def test_ignores_non_field_attributes(self):
+        """フィールド以外のインスタンス属性を含めないことを確認."""
+        stats = rsudp.types.SignalStatistics(total=1)
+        stats.extra = "not a field"
+
+        assert rsudp.types.dataclass_to_dict(stats) == dataclasses.asdict(stats)
@@ -221,6 +221,60 @@ class TestImageEndpoints:
         assert response.status_code == 200
         assert response.content_type == "image/png"
 
+    def test_get_ogp_image_cached(self, flask_app, flask_client, config):
+        """生成したOGP画像はディスクにキャッシュされ、2 回目は生成せずに再利用される"""
+        import unittest.mock
+
+        from PIL import Image
+
+        screenshot_dir = config.plot.screenshot.path
+        screenshot_dir.mkdir(parents=True, exist_ok=True)
+        test_file = screenshot_dir / "ogp-cache-test.png"
+        Image.new("RGB", (800, 600), color="red").save(test_file)
+
+        with flask_app.app_context():
+            ogp_path = viewer._get_ogp_cache_path(test_file, test_file.stat())
+
+        with unittest.mock.patch.object(
+            viewer, "_generate_ogp_image", wraps=viewer._generate_ogp_image
+        ) as generate_ogp_image:
+            first = flask_client.get("/rsudp/api/screenshot/ogp/ogp-cache-test.png")
+            assert generate_ogp_image.call_count == 1
+            assert ogp_path.is_file()
+
+            second = flask_client.get("/rsudp/api/screenshot/ogp/ogp-cache-test.png")
+            assert generate_ogp_image.call_count == 1
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.data == first.data
+        assert second.data == ogp_path.read_bytes()
+
+    def test_get_ogp_image_cache_evicted(self, flask_app, flask_client, config):
+        """OGP画像のキャッシュは上限数を超えると最終利用が古いものから削除される"""
+        import os
+        import unittest.mock
+
+        from PIL import Image
+
+        screenshot_dir = config.plot.screenshot.path
+        screenshot_dir.mkdir(parents=True, exist_ok=True)
+        ogp_paths = []
+        for index in range(3):
+            test_file = screenshot_dir / f"ogp-evict-{index}.png"
+            Image.new("RGB", (800, 600), color="red").save(test_file)
+            with flask_app.app_context():
+                ogp_paths.append(viewer._get_ogp_cache_path(test_file, test_file.stat()))
+
+        with unittest.mock.patch.object(viewer, "_OGP_CACHE_MAX_FILES", 2):
+            for index in range(3):
+                response = flask_client.get(f"/rsudp/api/screenshot/ogp/ogp-evict-{index}.png")
+                assert response.status_code == 200
+                # 生成順に最終利用時刻が古くなるようにする
+                os.utime(ogp_paths[index], (index, index))
+
+        assert [path.is_file() for path in ogp_paths] == [False, True, True]
+
 
 class TestLatestEndpoint:
     """最新スクリーンショットエンドポイントのテスト."""
@@ -249,6 +303,40 @@ class TestLatestEndpoint:
         assert data["filename"] == "SHAKE-2025-12-12-190500.png"
 
 
+class TestStreamEndpoint:
+    """NDJSON ストリームエンドポイントのテスト."""
+
+    def test_stream_screenshots(self, flask_client, config):
+        """1 行 1 件・タイムスタンプ降順で返し、min_max_signal で絞り込めることを確認."""
+        import json
+
+        from rsudp.screenshot_manager import ScreenshotManager
+
+        manager = ScreenshotManager(config)
+
+        with sqlite3.connect(manager.cache_path) as conn:
+            insert_screenshot_metadata(
+                conn, "SHAKE-2025-12-12-010000.png", timestamp="2025-12-12T01:00:00+00:00", max_count=500.0
+            )
+            insert_screenshot_metadata(
+                conn, "SHAKE-2025-12-12-020000.png", timestamp="2025-12-12T02:00:00+00:00", max_count=2000.0
+            )
+
+        response = flask_client.get("/rsudp/api/screenshot/stream/")
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line)["filename"] for line in lines] == [
+            "SHAKE-2025-12-12-020000.png",
+            "SHAKE-2025-12-12-010000.png",
+        ]
+
+        response = flask_client.get("/rsudp/api/screenshot/stream/?min_max_signal=1000")
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line)["filename"] for line in lines] == ["SHAKE-2025-12-12-020000.png"]
+
+
 class TestEarthquakeCrawlEndpoint:
     """地震クロールエンドポイントのテスト."""
 
@@ -413,6 +501,22 @@ class TestPathTraversal:
         response = flask_client.get("/rsudp/api/screenshot/image/..%2f..%2fsecret.png")
         assert response.status_code != 200
 
+    def test_get_image_file_path_follows_moved_file(self, flask_app, config):
+        """解決済みのファイルが移動されても、移動先のパスを返す."""
+        screenshot_dir = config.plot.screenshot.path
+        screenshot_dir.mkdir(parents=True, exist_ok=True)
+        source = screenshot_dir / "SHAKE-2025-12-13-010203.png"
+        source.write_text("x")
+
+        with flask_app.app_context():
+            assert viewer._get_image_file_path(source.name) == str(source)
+
+            date_dir = screenshot_dir / "2025" / "12" / "13"
+            date_dir.mkdir(parents=True, exist_ok=True)
+            moved = source.rename(date_dir / source.name)
+
+            assert viewer._get_image_file_path(source.name) == str(moved)
+
 
 class TestEarthquakeOnlyWithoutDb:
     """quake.db 不在時の earthquake_only 挙動テスト."""